@@ -12,6 +12,8 @@ from .middleware import (
     optional_auth,
     check_rate_limit,
     rate_limiter,
+    get_rate_limiter,
+    RateLimiter,
     TokenPayload,
     APIKeyInfo
 )
@@ -27,42 +29,8 @@ __all__ = [
     "optional_auth",
     "check_rate_limit",
     "rate_limiter",
+    "get_rate_limiter",
+    "RateLimiter",
     "TokenPayload",
     "APIKeyInfo"
 ]
-
-# backend/auth/__init__.py
-# 인증 모듈
-
-from .middleware import (
-    create_jwt_token,
-    decode_jwt_token,
-    validate_api_key,
-    generate_api_key,
-    get_current_user,
-    require_auth,
-    require_scope,
-    optional_auth,
-    check_rate_limit,
-    rate_limiter,
-    TokenPayload,
-    APIKeyInfo
-)
-
-__all__ = [
-    "create_jwt_token",
-    "decode_jwt_token",
-    "validate_api_key",
-    "generate_api_key",
-    "get_current_user",
-    "require_auth",
-    "require_scope",
-    "optional_auth",
-    "check_rate_limit",
-    "rate_limiter",
-    "TokenPayload",
-    "APIKeyInfo"
-]
-
-
-
@@ -11,7 +11,8 @@ from .middleware import (
     generate_api_key,
     require_auth,
     require_scope,
-    rate_limiter
+    get_rate_limiter,
+    RateLimiter
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -104,7 +105,10 @@ async def get_me(user: dict = Depends(require_auth)):
 
 
 @router.get("/rate-limit")
-async def get_rate_limit(user: dict = Depends(require_auth)):
+async def get_rate_limit(
+    user: dict = Depends(require_auth),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter)
+):
     """Rate Limit 상태"""
     client_id = user.get("client_id") or user.get("user_id")
     remaining = rate_limiter.get_remaining(client_id)
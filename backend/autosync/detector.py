@@ -1,7 +1,8 @@
 # backend/autosync/detector.py
 # SaaS 자동 감지기 (간소화)
 
-from typing import Dict, List, Optional
+import re
+from typing import Dict, List, Optional, Set, Tuple
 from .registry import SaaSRegistry, SystemType
 
 
@@ -12,46 +13,90 @@ class AutoSyncDetector:
     쿠키/도메인/API키로 SaaS 자동 감지
     """
     
+    __slots__ = ("registry", "detected", "_cookie_owner", "_cookie_re", "_key_owner", "_key_re",
+                 "_domain_trie", "_path_domains")
+    
     def __init__(self):
         self.registry = SaaSRegistry
         self.detected: List[str] = []
+        
+        # 쿠키 마커(소문자) → 시스템 ID 집합 (같은 마커를 여러 시스템이 공유 가능)
+        self._cookie_owner: Dict[str, Set[str]] = {}
+        for sys_id, cfg in self.registry.SYSTEMS.items():
+            for p in cfg.get("detection", {}).get("cookies") or []:
+                self._cookie_owner.setdefault(p.lower(), set()).add(sys_id)
+        
+        # 전체 마커를 하나의 정규식으로 (lookahead → 위치마다 매칭, 쿠키 문자열 1회 스캔)
+        # 같은 위치에서는 가장 긴 마커 하나만 매칭됨 → 그 마커의 접두사인 (더 짧은) 마커의
+        # 시스템도 미리 합쳐 둠 (같은 위치에서 시작하는 마커 = 매칭 마커의 접두사)
+        markers = sorted(self._cookie_owner, key=len, reverse=True)
+        self._cookie_owner = {
+            m: set().union(*(self._cookie_owner[p] for p in markers if m.startswith(p)))
+            for m in markers
+        }
+        self._cookie_re = re.compile("(?=(%s))" % "|".join(map(re.escape, markers))) if markers else None
+        
+        # API 키 접두사 → 시스템별 그룹 하나씩 (등록 순서 = 기존 우선순위)
+        self._key_owner: List[str] = []
+        groups = []
+        for sys_id, cfg in self.registry.SYSTEMS.items():
+            prefixes = cfg.get("detection", {}).get("api_patterns") or []
+            if prefixes:
+                groups.append("(?P<k%d>%s)" % (len(self._key_owner), "|".join(map(re.escape, prefixes))))
+                self._key_owner.append(sys_id)
+        self._key_re = re.compile("|".join(groups)) if groups else None
+        
+        # 도메인 라벨 역순 트라이 (com → stripe → js), None 키에 시스템 ID
+        # 경로가 붙은 패턴 (예: toss.im/pos)은 트라이에 못 넣음 → 부분 문자열 비교
+        self._domain_trie: Dict = {}
+        self._path_domains: List[Tuple[str, str]] = []
+        for sys_id, cfg in self.registry.SYSTEMS.items():
+            for d in cfg.get("detection", {}).get("domains") or []:
+                d = d.lower()
+                if "/" in d:
+                    self._path_domains.append((d, sys_id))
+                    continue
+                node = self._domain_trie
+                for label in reversed(d.split(".")):
+                    node = node.setdefault(label, {})
+                node.setdefault(None, set()).add(sys_id)
     
     def detect_from_cookies(self, cookies: str) -> List[str]:
         """쿠키에서 SaaS 감지"""
-        detected = []
-        cookies_lower = cookies.lower()
+        if self._cookie_re is None:
+            return []
         
-        for sys_id, cfg in self.registry.SYSTEMS.items():
-            patterns = cfg.get("detection", {}).get("cookies", [])
-            for p in patterns:
-                if p.lower() in cookies_lower:
-                    detected.append(sys_id)
-                    break
-        
-        return list(set(detected))
+        owner = self._cookie_owner
+        detected = set()
+        for m in self._cookie_re.finditer(cookies.lower()):
+            detected.update(owner[m.group(1)])
+        return list(detected)
     
     def detect_from_domains(self, domains: List[str]) -> List[str]:
-        """도메인에서 SaaS 감지"""
-        detected = []
+        """도메인에서 SaaS 감지 (등록 도메인 또는 그 서브도메인)"""
+        detected = set()
         
-        for sys_id, cfg in self.registry.SYSTEMS.items():
-            patterns = cfg.get("detection", {}).get("domains", [])
-            for d in domains:
-                for p in patterns:
-                    if p in d:
-                        detected.append(sys_id)
-                        break
+        for d in domains:
+            d = d.lower()
+            for pattern, sys_id in self._path_domains:
+                if pattern in d:
+                    detected.add(sys_id)
+            
+            # 호스트만 추출 후 라벨 역순으로 트라이 1회 순회
+            host = d.split("://", 1)[-1].split("/", 1)[0].split(":", 1)[0]
+            node = self._domain_trie
+            for label in reversed(host.split(".")):
+                node = node.get(label)
+                if node is None:
+                    break
+                detected.update(node.get(None, ()))
         
-        return list(set(detected))
+        return list(detected)
     
     def detect_from_api_key(self, key: str) -> Optional[str]:
         """API 키 패턴으로 감지"""
-        for sys_id, cfg in self.registry.SYSTEMS.items():
-            patterns = cfg.get("detection", {}).get("api_patterns", [])
-            for p in patterns:
-                if key.startswith(p):
-                    return sys_id
-        return None
+        m = self._key_re.match(key) if self._key_re else None
+        return self._key_owner[int(m.lastgroup[1:])] if m else None
     
     def detect_all(
         self,
@@ -36,11 +36,18 @@ ALL_SYSTEMS = {
     **_tag_type(ACCOUNTING_SYSTEMS.copy(), SystemType.ACCOUNTING),
 }
 
+# 타입별 인덱스 (레지스트리는 import 후 불변 → 1회 계산)
+_BY_TYPE = {
+    t: {k: v for k, v in ALL_SYSTEMS.items() if v.get("type") == t}
+    for t in SystemType
+}
+
 
 class SaaSRegistry:
     """SaaS 레지스트리 접근자"""
     
     SYSTEMS = ALL_SYSTEMS
+    _BY_TYPE = _BY_TYPE
     
     @classmethod
     def get_all(cls) -> Dict:
@@ -48,7 +55,7 @@ class SaaSRegistry:
     
     @classmethod
     def get_by_type(cls, sys_type: SystemType) -> Dict:
-        return {k: v for k, v in cls.SYSTEMS.items() if v.get("type") == sys_type}
+        return cls._BY_TYPE.get(sys_type, {})
     
     @classmethod
     def get_mapping(cls, system_id: str) -> Optional[Dict]:
@@ -1,38 +1,75 @@
 # backend/autosync/transformer.py
 # Universal Transformer (간소화)
 
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 from .registry import SaaSRegistry
 
 
+# 매핑 경로 → 분리된 키 튜플 (호출마다 split 없음)
+def _split_paths(paths) -> Tuple[Tuple[str, ...], ...]:
+    paths = [paths] if isinstance(paths, str) else (paths or [])
+    return tuple(tuple(p.split(".")) for p in paths if isinstance(p, str))
+
+
+def _compile(mapping: Dict) -> Tuple:
+    """
+    시스템 매핑 → (id 경로, 금액 경로, 나누기, 시간 경로)
+    
+    value 설정은 후보 경로 목록 + 선택적 숫자 나누기
+    (예: ["amount", 100], ["payment", "tuition", "amount"])
+    """
+    value_cfg = mapping.get("value") or []
+    value_cfg = [value_cfg] if isinstance(value_cfg, str) else value_cfg
+    divs = [c for c in value_cfg if isinstance(c, (int, float))]
+    
+    return (
+        _split_paths(mapping.get("node_id")),
+        _split_paths(value_cfg),
+        divs[0] if divs else 1,
+        _split_paths(mapping.get("timestamp")),
+    )
+
+
 class UniversalTransformer:
     """모든 SaaS → {node_id, value, timestamp}"""
     
     FORBIDDEN = {"name", "email", "phone", "address", "description", "note"}
     
+    __slots__ = ("_plans",)
+    
+    def __init__(self):
+        # 시스템별 변환 계획 (레지스트리는 정적 → 생성 시 1회 컴파일)
+        self._plans: Dict[str, Tuple] = {
+            sys_id: _compile(cfg["mapping"])
+            for sys_id, cfg in SaaSRegistry.get_all().items()
+            if cfg.get("mapping")
+        }
+    
     def transform(self, data: Dict, system_id: Optional[str] = None) -> Dict:
-        mapping = SaaSRegistry.get_mapping(system_id) if system_id else None
+        plan = self._plans.get(system_id) if system_id else None
         
-        if not mapping:
+        if plan is None:
             return self._generic(data)
         
+        id_paths, value_paths, div, time_paths = plan
         return {
-            "node_id": self._get_id(data, mapping.get("node_id", [])),
-            "value": self._get_value(data, mapping.get("value", [])),
-            "timestamp": self._get_time(data, mapping.get("timestamp", [])),
-            "source": system_id or "unknown"
+            "node_id": self._get_id(data, id_paths),
+            "value": self._get_value(data, value_paths, div),
+            "timestamp": self._get_time(data, time_paths),
+            "source": system_id
         }
     
-    def _get_nested(self, data: Dict, path: str) -> Any:
-        for p in path.split("."):
+    @staticmethod
+    def _get_nested(data: Dict, parts: Tuple[str, ...]) -> Any:
+        for p in parts:
             data = data.get(p) if isinstance(data, dict) else None
             if data is None:
                 return None
         return data
     
     def _get_id(self, data: Dict, paths) -> str:
-        paths = [paths] if isinstance(paths, str) else paths
         for p in paths:
             v = self._get_nested(data, p)
             if v:
@@ -42,30 +79,24 @@ class UniversalTransformer:
                 return str(data[k])
         return f"anon_{id(data)}"
     
-    def _get_value(self, data: Dict, cfg) -> float:
-        if isinstance(cfg, list) and len(cfg) >= 2:
-            path, div = cfg[0], cfg[1]
-        else:
-            path = cfg[0] if isinstance(cfg, list) else cfg
-            div = 1
-        
-        v = self._get_nested(data, path) if path else None
-        if v:
-            try:
-                return float(v) / div
-            except:
-                pass
+    def _get_value(self, data: Dict, paths, div: float = 1) -> float:
+        for p in paths:
+            v = self._get_nested(data, p)
+            if v:
+                try:
+                    return float(v) / div
+                except (TypeError, ValueError):
+                    pass
         
         for k in ["amount", "total", "total_price", "totalAmount"]:
             if k in data:
                 try:
                     return float(data[k]) / div
-                except:
+                except (TypeError, ValueError):
                     pass
         return 0.0
     
     def _get_time(self, data: Dict, paths) -> str:
-        paths = [paths] if isinstance(paths, str) else paths
         for p in paths:
             v = self._get_nested(data, p)
             if v:
@@ -77,9 +108,9 @@ class UniversalTransformer:
     
     def _generic(self, data: Dict) -> Dict:
         return {
-            "node_id": self._get_id(data, []),
-            "value": self._get_value(data, []),
-            "timestamp": self._get_time(data, []),
+            "node_id": self._get_id(data, ()),
+            "value": self._get_value(data, ()),
+            "timestamp": self._get_time(data, ()),
             "source": "unknown"
         }
 
@@ -94,12 +125,18 @@ class FlowTypeDetector:
         event = str(
             data.get("type") or data.get("event") or 
             data.get("status") or ""
-        ).lower()
-        
-        for kw in cls.OUTFLOW:
-            if kw in event:
-                return "outflow"
-        return "inflow"
+        )
+        return _flow_of(event)
+
+
+@lru_cache(maxsize=1024)
+def _flow_of(event: str) -> str:
+    """이벤트명 → 방향 (이벤트 종류가 적어 반복 호출은 캐시 히트)"""
+    event = event.lower()
+    for kw in FlowTypeDetector.OUTFLOW:
+        if kw in event:
+            return "outflow"
+    return "inflow"
 
 
 transformer = UniversalTransformer()
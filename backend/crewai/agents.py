@@ -1,6 +1,7 @@
 # backend/crewai/agents.py
 # CrewAI 3명 에이전트 (간소화)
 
+from collections import Counter
 from typing import Dict, List, Any
 import os
 
@@ -101,10 +102,16 @@ def analyze_with_crewai(nodes: List[Dict], motions: List[Dict]) -> Dict:
 
 def create_summary(nodes: List[Dict], motions: List[Dict]) -> str:
     """LLM용 데이터 요약"""
-    total = sum(n.get('value', 0) for n in nodes)
-    low_value = [n for n in nodes if n.get('value', 0) <= 0]
-    
-    return f"노드 {len(nodes)}개, 총 가치 ₩{total:,.0f}, 저가치 {len(low_value)}개"
+    # 총합/저가치 수를 한 번의 순회로 계산
+    total = 0
+    low_count = 0
+    for n in nodes:
+        v = n.get('value', 0)
+        total += v
+        if v <= 0:
+            low_count += 1
+    
+    return f"노드 {len(nodes)}개, 총 가치 ₩{total:,.0f}, 저가치 {low_count}개"
 
 
 def rule_based_analysis(nodes: List[Dict], motions: List[Dict]) -> Dict:
@@ -116,15 +123,12 @@ def rule_based_analysis(nodes: List[Dict], motions: List[Dict]) -> Dict:
         for n in nodes if n.get('value', 0) <= 0
     ]
     
-    # 자동화 대상
-    motion_counts = {}
-    for m in motions:
-        k = f"{m.get('source')}->{m.get('target')}"
-        motion_counts[k] = motion_counts.get(k, 0) + 1
+    # 자동화 대상 - (source, target) 튜플로 집계, 문자열 키는 3회 이상만 생성
+    motion_counts = Counter((m.get('source'), m.get('target')) for m in motions)
     
     automate_targets = [
-        {"motion": k, "frequency": v}
-        for k, v in motion_counts.items() if v >= 3
+        {"motion": f"{src}->{tgt}", "frequency": v}
+        for (src, tgt), v in motion_counts.items() if v >= 3
     ]
     
     # 예상 효과
@@ -1,6 +1,10 @@
 # backend/main.py
 # AUTUS 통합 API - 모든 기능 포함
 
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Tuple
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -17,15 +21,44 @@ from auth.api import router as auth_router
 from websocket.api import router as ws_router, http_router as ws_http_router
 from physics.router import router as physics_router
 
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+def start_log_listener() -> Tuple[QueueHandler, QueueListener, int]:
+    """로그 출력을 백그라운드 스레드로 분리 (이벤트 루프에서 stdout 블로킹 방지)
+    
+    반환: (큐 핸들러, 리스너, 이전 루트 로그 레벨) → stop_log_listener로 원복
+    """
+    log_queue = queue.SimpleQueue()
+    handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    previous_level = root.level
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return handler, listener, previous_level
+
+def stop_log_listener(handler: QueueHandler, listener: QueueListener, previous_level: int):
+    """리스너 정지 + 루트 로거 핸들러/레벨 원복"""
+    listener.stop()
+    root = logging.getLogger()
+    root.removeHandler(handler)
+    root.setLevel(previous_level)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 라이프사이클"""
+    log_handler, log_listener, root_level = start_log_listener()
     print("🚀 AUTUS Integration Hub 시작")
     print("   - Auth: JWT + API Key 인증")
     print("   - WebSocket: 실시간 Physics Map")
     print("   - Physics: 물리 엔진 API")
     yield
     print("👋 AUTUS Integration Hub 종료")
+    stop_log_listener(log_handler, log_listener, root_level)
 
 app = FastAPI(
     title="AUTUS Integration Hub",
@@ -187,6 +220,8 @@ async def strategy():
 # 직접 실행 시
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # 브로드캐스트는 같은 메시지를 N명에게 보냄 → per-message deflate는 압축을 N번 반복
+    # (연결마다 압축 컨텍스트 메모리도 유지) → 끔
+    uvicorn.run(app, host="0.0.0.0", port=8000, ws_per_message_deflate=False)
 
 
@@ -64,16 +64,16 @@ class ConnectionManager:
         self.active_connections.discard(websocket)
     
     async def broadcast(self, message: dict):
-        """모든 연결에 상태 브로드캐스트"""
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                disconnected.add(connection)
+        """모든 연결에 상태 브로드캐스트 (동시 전송, 실패 연결은 결과에서 수집)"""
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(connection.send_json(message) for connection in connections),
+            return_exceptions=True
+        )
         
-        for conn in disconnected:
-            self.disconnect(conn)
+        for conn, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(conn)
 
 manager = ConnectionManager()
 
@@ -430,5 +430,6 @@ if __name__ == "__main__":
         "api_server:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        ws_per_message_deflate=False  # 브로드캐스트 시 연결별 중복 압축 방지
     )
@@ -0,0 +1,66 @@
+# backend/webhooks/dedup.py
+# 웹훅 재전송 중복 제거 - 정제 결과 TTL 캐시
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+WEBHOOK_DEDUP_TTL = float(os.getenv("WEBHOOK_DEDUP_TTL", "300"))
+WEBHOOK_DEDUP_MAXSIZE = int(os.getenv("WEBHOOK_DEDUP_MAXSIZE", "4096"))
+
+
+class CleanseCache:
+    """
+    정제 결과 TTL 캐시
+
+    Stripe/Shopify는 at-least-once 전송이라 같은 페이로드를 재전송함
+    (source, topic, 페이로드 해시) 키로 정제 결과를 보관 → 재전송은 정제/Neo4j 기록 생략
+    topic이 헤더로만 오는 소스(Shopify)는 같은 본문이 다른 토픽으로 올 수 있어 키에 포함
+    처리가 접수된 이벤트만 저장할 것 (실패/미처리 이벤트를 저장하면 재전송이 버려짐)
+    """
+
+    def __init__(self, ttl: float = WEBHOOK_DEDUP_TTL, maxsize: int = WEBHOOK_DEDUP_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # TTL이 고정이므로 삽입 순서 = 만료 순서
+        self._entries: "OrderedDict[Tuple[str, str, bytes], Tuple[float, Dict]]" = OrderedDict()
+
+    @staticmethod
+    def key(source: str, payload: bytes, topic: str = "") -> Tuple[str, str, bytes]:
+        """캐시 키 (source, topic, blake2b 해시)"""
+        return (source, topic, hashlib.blake2b(payload, digest_size=16).digest())
+
+    def get(self, key: Tuple[str, str, bytes]) -> Optional[Dict]:
+        """캐시된 정제 결과 (만료 시 None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, cleaned = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return cleaned
+
+    def put(self, key: Tuple[str, str, bytes], cleaned: Dict):
+        """정제 결과 저장"""
+        now = time.monotonic()
+        self._entries[key] = (now + self.ttl, cleaned)
+        self._entries.move_to_end(key)
+
+        # 만료/초과 항목 정리 (앞쪽이 가장 오래됨)
+        while self._entries:
+            oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at >= now and len(self._entries) <= self.maxsize:
+                break
+            del self._entries[oldest_key]
+
+    def clear(self):
+        """캐시 비우기"""
+        self._entries.clear()
+
+
+# 글로벌 인스턴스
+cleanse_cache = CleanseCache()
@@ -1,37 +1,108 @@
 # backend/webhooks/shopify_webhook.py
 # Shopify 주문/고객 웹훅 처리
 
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
 import hmac
-import hashlib
 import base64
+import binascii
+import math
+import json
 import os
-from typing import Optional
-from integrations.zero_meaning import ZeroMeaningCleaner
-from integrations.neo4j_client import Neo4jClient
+from typing import Union
+from integrations.zero_meaning import cleaner
+from integrations.neo4j_client import neo4j
+from webhooks.dedup import cleanse_cache
+from webhooks.tasks import run_logged
 
 router = APIRouter()
-cleaner = ZeroMeaningCleaner()
-neo4j = Neo4jClient()
 
 SHOPIFY_API_SECRET = os.getenv("SHOPIFY_API_SECRET", "shpss_xxx")
+_SHOPIFY_API_SECRET_BYTES = SHOPIFY_API_SECRET.encode()  # 요청마다 재인코딩 방지
 
-def verify_shopify_hmac(payload: bytes, hmac_header: str, secret: str) -> bool:
-    """Shopify HMAC 검증"""
+def verify_shopify_hmac(payload: bytes, hmac_header: str, secret: Union[str, bytes]) -> bool:
+    """Shopify HMAC 검증 (raw bytes 상수 시간 비교)"""
+    key = secret.encode() if isinstance(secret, str) else secret
     try:
-        computed = base64.b64encode(
-            hmac.new(secret.encode(), payload, hashlib.sha256).digest()
-        ).decode()
-        return hmac.compare_digest(computed, hmac_header)
-    except:
+        computed = hmac.digest(key, payload, "sha256")
+        return hmac.compare_digest(computed, base64.b64decode(hmac_header, validate=True))
+    except (ValueError, binascii.Error):
         return False
 
+# ═══════════════════════════════════════════════════════════════
+# 토픽별 처리 (topic → 핸들러 디스패치 테이블)
+# ═══════════════════════════════════════════════════════════════
+
+async def _handle_order_inflow(cleaned: dict, data: dict) -> dict:
+    """주문 생성/결제 → inflow"""
+    # 고객 노드 (없으면 게스트)
+    customer_id = cleaned.get("node_id") or f"guest_{data.get('id', 'unknown')}"
+    
+    node = await neo4j.upsert_node(
+        external_id=customer_id,
+        source="shopify"
+    )
+    
+    motion = await neo4j.create_motion(
+        source_id=customer_id,
+        target_id="owner",
+        amount=cleaned["value"],
+        direction="inflow"
+    )
+    
+    return {"node": node, "motion": motion}
+
+async def _handle_order_cancelled(cleaned: dict, data: dict) -> dict:
+    """주문 취소 → outflow (환불)"""
+    customer_id = cleaned.get("node_id") or f"guest_{data.get('id', 'unknown')}"
+    
+    motion = await neo4j.create_motion(
+        source_id="owner",
+        target_id=customer_id,
+        amount=cleaned["value"],
+        direction="outflow"
+    )
+    
+    return {"motion": motion}
+
+async def _handle_refund(cleaned: dict, data: dict) -> dict:
+    """환불 → outflow"""
+    customer_id = cleaned.get("node_id") or "unknown"
+    # fsum: 라인 아이템이 많아도 부동소수 누적 오차 없음
+    refund_amount = math.fsum(
+        float(item.get("subtotal") or 0)
+        for item in data.get("refund_line_items") or ()
+    )
+    
+    motion = await neo4j.create_motion(
+        source_id="owner",
+        target_id=customer_id,
+        amount=refund_amount,
+        direction="outflow"
+    )
+    
+    return {"motion": motion}
+
+async def _handle_customer_create(cleaned: dict, data: dict) -> dict:
+    """고객 생성 → 노드 생성"""
+    node = await neo4j.upsert_node(
+        external_id=cleaned["node_id"],
+        source="shopify"
+    )
+    
+    return {"node": node}
+
+_TOPIC_HANDLERS = {
+    "orders/create": _handle_order_inflow,
+    "orders/paid": _handle_order_inflow,
+    "orders/cancelled": _handle_order_cancelled,
+    "refunds/create": _handle_refund,
+    "customers/create": _handle_customer_create,
+}
+
 @router.post("")
 async def shopify_webhook(
     request: Request,
-    x_shopify_hmac_sha256: Optional[str] = Header(None),
-    x_shopify_topic: Optional[str] = Header(None),
-    x_shopify_shop_domain: Optional[str] = Header(None)
+    background_tasks: BackgroundTasks
 ):
     """
     Shopify 웹훅 엔드포인트
@@ -42,80 +113,35 @@ async def shopify_webhook(
     - orders/cancelled → outflow
     - refunds/create → outflow
     - customers/create → node_create
+    
+    Neo4j 기록은 응답 후 백그라운드에서 처리 (Neo4j 지연 → Shopify 재전송 방지)
     """
     payload = await request.body()
+    hmac_header = request.headers.get("x-shopify-hmac-sha256")
+    topic = request.headers.get("x-shopify-topic", "")
     
     # HMAC 검증
-    if x_shopify_hmac_sha256 and SHOPIFY_API_SECRET != "shpss_xxx":
-        if not verify_shopify_hmac(payload, x_shopify_hmac_sha256, SHOPIFY_API_SECRET):
+    if hmac_header and SHOPIFY_API_SECRET != "shpss_xxx":
+        if not verify_shopify_hmac(payload, hmac_header, _SHOPIFY_API_SECRET_BYTES):
             raise HTTPException(status_code=401, detail="Invalid HMAC")
     
-    import json
-    data = json.loads(payload)
+    # 재전송 중복 제거
+    # 같은 본문이 다른 토픽으로 올 수 있음 → 토픽 포함 키
+    cache_key = cleanse_cache.key("shopify", payload, topic)
+    cached = cleanse_cache.get(cache_key)
+    if cached is not None:
+        return {"topic": topic, "deduped": True, "node_id": cached["node_id"], "processed": False}
     
-    topic = x_shopify_topic or ""
+    data = json.loads(payload)
     
     # Zero Meaning 정제
     cleaned = cleaner.cleanse(data, source="shopify")
     
-    result = {"topic": topic, "processed": False}
-    
-    if topic in ["orders/create", "orders/paid"]:
-        # 주문 생성/결제 → inflow
-        # 고객 노드 (없으면 게스트)
-        customer_id = cleaned.get("node_id") or f"guest_{data.get('id', 'unknown')}"
-        
-        node = await neo4j.upsert_node(
-            external_id=customer_id,
-            source="shopify"
-        )
-        
-        motion = await neo4j.create_motion(
-            source_id=customer_id,
-            target_id="owner",
-            amount=cleaned["value"],
-            direction="inflow"
-        )
-        
-        result = {"topic": topic, "node": node, "motion": motion, "processed": True}
-    
-    elif topic == "orders/cancelled":
-        # 주문 취소 → outflow (환불)
-        customer_id = cleaned.get("node_id") or f"guest_{data.get('id', 'unknown')}"
-        
-        motion = await neo4j.create_motion(
-            source_id="owner",
-            target_id=customer_id,
-            amount=cleaned["value"],
-            direction="outflow"
-        )
-        
-        result = {"topic": topic, "motion": motion, "processed": True}
-    
-    elif topic == "refunds/create":
-        # 환불 → outflow
-        customer_id = cleaned.get("node_id") or "unknown"
-        refund_amount = sum(
-            float(item.get("subtotal", 0)) 
-            for item in data.get("refund_line_items", [])
-        )
-        
-        motion = await neo4j.create_motion(
-            source_id="owner",
-            target_id=customer_id,
-            amount=refund_amount,
-            direction="outflow"
-        )
-        
-        result = {"topic": topic, "motion": motion, "processed": True}
-    
-    elif topic == "customers/create":
-        # 고객 생성 → 노드 생성
-        node = await neo4j.upsert_node(
-            external_id=cleaned["node_id"],
-            source="shopify"
-        )
-        
-        result = {"topic": topic, "node": node, "processed": True}
-    
-    return result
+    # 토픽별 처리
+    handler = _TOPIC_HANDLERS.get(topic)
+    if handler is None:
+        return {"topic": topic, "processed": False}
+    
+    background_tasks.add_task(run_logged, handler, cleaned, data)
+    cleanse_cache.put(cache_key, cleaned)  # 접수된 이벤트만 캐시
+    return {"topic": topic, "node_id": cleaned.get("node_id"), "accepted": True}
@@ -1,46 +1,92 @@
 # backend/webhooks/stripe_webhook.py
 # Stripe 결제 웹훅 처리
 
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
 import hmac
-import hashlib
+import json
 import os
-from typing import Optional
-from integrations.zero_meaning import ZeroMeaningCleaner
-from integrations.neo4j_client import Neo4jClient
+from typing import Union
+from integrations.zero_meaning import cleaner
+from integrations.neo4j_client import neo4j
+from webhooks.dedup import cleanse_cache
+from webhooks.tasks import run_logged
 
 router = APIRouter()
-cleaner = ZeroMeaningCleaner()
-neo4j = Neo4jClient()
 
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "whsec_xxx")
+_STRIPE_WEBHOOK_SECRET_BYTES = STRIPE_WEBHOOK_SECRET.encode()  # 요청마다 재인코딩 방지
 
-def verify_stripe_signature(payload: bytes, sig_header: str, secret: str) -> bool:
-    """Stripe 서명 검증"""
+def verify_stripe_signature(payload: bytes, sig_header: str, secret: Union[str, bytes]) -> bool:
+    """Stripe 서명 검증 (raw bytes 상수 시간 비교)"""
+    key = secret.encode() if isinstance(secret, str) else secret
     try:
-        timestamp, signature = None, None
-        for item in sig_header.split(","):
-            key, value = item.split("=")
-            if key == "t":
-                timestamp = value
-            elif key == "v1":
-                signature = value
+        parts = dict(item.split("=", 1) for item in sig_header.split(","))
+        signature = bytes.fromhex(parts["v1"])
         
-        signed_payload = f"{timestamp}.{payload.decode()}"
-        expected = hmac.new(
-            secret.encode(),
-            signed_payload.encode(),
-            hashlib.sha256
-        ).hexdigest()
+        signed_payload = f"{parts['t']}.".encode() + payload
+        expected = hmac.digest(key, signed_payload, "sha256")
         
         return hmac.compare_digest(expected, signature)
-    except:
+    except (ValueError, KeyError):
         return False
 
+# ═══════════════════════════════════════════════════════════════
+# 이벤트별 처리 (event_type → 핸들러 디스패치 테이블)
+# ═══════════════════════════════════════════════════════════════
+
+async def _handle_payment_succeeded(cleaned: dict) -> dict:
+    """결제 성공 → inflow 모션 생성"""
+    node = await neo4j.upsert_node(
+        external_id=cleaned["node_id"],
+        source="stripe"
+    )
+    motion = await neo4j.create_motion(
+        source_id=cleaned["node_id"],
+        target_id="owner",
+        amount=cleaned["value"],
+        direction="inflow"
+    )
+    return {"node": node, "motion": motion}
+
+async def _handle_charge_refunded(cleaned: dict) -> dict:
+    """환불 → outflow 모션 생성"""
+    motion = await neo4j.create_motion(
+        source_id="owner",
+        target_id=cleaned["node_id"],
+        amount=cleaned["value"],
+        direction="outflow"
+    )
+    return {"motion": motion}
+
+async def _handle_customer_created(cleaned: dict) -> dict:
+    """고객 생성 → 노드 생성"""
+    node = await neo4j.upsert_node(
+        external_id=cleaned["node_id"],
+        source="stripe"
+    )
+    return {"node": node}
+
+async def _handle_invoice_paid(cleaned: dict) -> dict:
+    """인보이스 결제 → inflow"""
+    motion = await neo4j.create_motion(
+        source_id=cleaned["node_id"],
+        target_id="owner",
+        amount=cleaned["value"],
+        direction="inflow"
+    )
+    return {"motion": motion}
+
+_EVENT_HANDLERS = {
+    "payment_intent.succeeded": _handle_payment_succeeded,
+    "charge.refunded": _handle_charge_refunded,
+    "customer.created": _handle_customer_created,
+    "invoice.paid": _handle_invoice_paid,
+}
+
 @router.post("")
 async def stripe_webhook(
     request: Request,
-    stripe_signature: Optional[str] = Header(None, alias="stripe-signature")
+    background_tasks: BackgroundTasks
 ):
     """
     Stripe 웹훅 엔드포인트
@@ -50,15 +96,23 @@ async def stripe_webhook(
     - charge.refunded → outflow
     - customer.created → node_create
     - invoice.paid → inflow
+    
+    Neo4j 기록은 응답 후 백그라운드에서 처리 (Neo4j 지연 → Stripe 재전송 방지)
     """
     payload = await request.body()
+    stripe_signature = request.headers.get("stripe-signature")
     
     # 서명 검증
     if stripe_signature and STRIPE_WEBHOOK_SECRET != "whsec_xxx":
-        if not verify_stripe_signature(payload, stripe_signature, STRIPE_WEBHOOK_SECRET):
+        if not verify_stripe_signature(payload, stripe_signature, _STRIPE_WEBHOOK_SECRET_BYTES):
             raise HTTPException(status_code=400, detail="Invalid signature")
     
-    import json
+    # 재전송 중복 제거
+    cache_key = cleanse_cache.key("stripe", payload)
+    cached = cleanse_cache.get(cache_key)
+    if cached is not None:
+        return {"deduped": True, "node_id": cached["node_id"], "processed": False}
+    
     data = json.loads(payload)
     
     event_type = data.get("type", "")
@@ -68,48 +122,10 @@ async def stripe_webhook(
     cleaned = cleaner.cleanse(event_data, source="stripe")
     
     # 이벤트별 처리
-    result = {"event": event_type, "processed": False}
-    
-    if event_type == "payment_intent.succeeded":
-        # 결제 성공 → inflow 모션 생성
-        node = await neo4j.upsert_node(
-            external_id=cleaned["node_id"],
-            source="stripe"
-        )
-        motion = await neo4j.create_motion(
-            source_id=cleaned["node_id"],
-            target_id="owner",
-            amount=cleaned["value"],
-            direction="inflow"
-        )
-        result = {"event": event_type, "node": node, "motion": motion, "processed": True}
-    
-    elif event_type == "charge.refunded":
-        # 환불 → outflow 모션 생성
-        motion = await neo4j.create_motion(
-            source_id="owner",
-            target_id=cleaned["node_id"],
-            amount=cleaned["value"],
-            direction="outflow"
-        )
-        result = {"event": event_type, "motion": motion, "processed": True}
-    
-    elif event_type == "customer.created":
-        # 고객 생성 → 노드 생성
-        node = await neo4j.upsert_node(
-            external_id=cleaned["node_id"],
-            source="stripe"
-        )
-        result = {"event": event_type, "node": node, "processed": True}
-    
-    elif event_type == "invoice.paid":
-        # 인보이스 결제 → inflow
-        motion = await neo4j.create_motion(
-            source_id=cleaned["node_id"],
-            target_id="owner",
-            amount=cleaned["value"],
-            direction="inflow"
-        )
-        result = {"event": event_type, "motion": motion, "processed": True}
+    handler = _EVENT_HANDLERS.get(event_type)
+    if handler is None:
+        return {"event": event_type, "processed": False}
     
-    return result
+    background_tasks.add_task(run_logged, handler, cleaned)
+    cleanse_cache.put(cache_key, cleaned)  # 접수된 이벤트만 캐시
+    return {"event": event_type, "node_id": cleaned["node_id"], "accepted": True}
@@ -0,0 +1,19 @@
+# backend/webhooks/tasks.py
+# 웹훅 후처리 - 200 응답 후 백그라운드 실행 (Neo4j 기록, WebSocket 전송)
+
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_logged(handler: Callable[..., Awaitable[Any]], *args):
+    """
+    백그라운드 핸들러 실행
+
+    응답이 이미 나간 뒤라 예외가 호출자에게 전달되지 않음 → 로그로 기록
+    """
+    try:
+        await handler(*args)
+    except Exception:
+        logger.exception("웹훅 후처리 실패 (%s)", handler.__name__)
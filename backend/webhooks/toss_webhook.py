@@ -1,20 +1,40 @@
 # backend/webhooks/toss_webhook.py
 # 토스페이먼츠 결제 웹훅 처리
 
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Request, BackgroundTasks
 import os
-from typing import Optional
-from integrations.zero_meaning import ZeroMeaningCleaner
-from integrations.neo4j_client import Neo4jClient
+from integrations.neo4j_client import neo4j
+from webhooks.tasks import run_logged
 
 router = APIRouter()
-cleaner = ZeroMeaningCleaner()
-neo4j = Neo4jClient()
 
 TOSS_SECRET_KEY = os.getenv("TOSS_SECRET_KEY", "test_sk_xxx")
 
+async def _process_inflow(node_id: str, amount: float, source: str):
+    """결제 완료 → 노드 생성/업데이트 + inflow 모션"""
+    await neo4j.upsert_node(
+        external_id=node_id,
+        source=source
+    )
+    
+    await neo4j.create_motion(
+        source_id=node_id,
+        target_id="owner",
+        amount=amount,
+        direction="inflow"
+    )
+
+async def _process_outflow(node_id: str, amount: float):
+    """취소 → outflow 모션"""
+    await neo4j.create_motion(
+        source_id="owner",
+        target_id=node_id,
+        amount=amount,
+        direction="outflow"
+    )
+
 @router.post("")
-async def toss_webhook(request: Request):
+async def toss_webhook(request: Request, background_tasks: BackgroundTasks):
     """
     토스페이먼츠 웹훅 엔드포인트
     
@@ -22,8 +42,9 @@ async def toss_webhook(request: Request):
     - DONE (결제 완료) → inflow
     - CANCELED (결제 취소) → outflow
     - PARTIAL_CANCELED (부분 취소) → outflow
+    
+    Neo4j 기록은 응답 후 백그라운드에서 처리
     """
-    import json
     data = await request.json()
     
     event_type = data.get("status", "")
@@ -35,53 +56,28 @@ async def toss_webhook(request: Request):
         "timestamp": data.get("approvedAt") or data.get("requestedAt")
     }
     
-    result = {"status": event_type, "processed": False}
-    
     if event_type == "DONE":
         # 결제 완료 → inflow
-        node = await neo4j.upsert_node(
-            external_id=cleaned["node_id"],
-            source="toss"
-        )
-        
-        motion = await neo4j.create_motion(
-            source_id=cleaned["node_id"],
-            target_id="owner",
-            amount=cleaned["value"],
-            direction="inflow"
-        )
-        
-        result = {
-            "status": event_type,
-            "node": node,
-            "motion": motion,
-            "amount": cleaned["value"],
-            "processed": True
-        }
+        amount = cleaned["value"]
+        background_tasks.add_task(run_logged, _process_inflow, cleaned["node_id"], amount, "toss")
     
     elif event_type in ["CANCELED", "PARTIAL_CANCELED"]:
         # 취소 → outflow
-        cancel_amount = float(data.get("cancels", [{}])[0].get("cancelAmount", 0)) if data.get("cancels") else cleaned["value"]
-        
-        motion = await neo4j.create_motion(
-            source_id="owner",
-            target_id=cleaned["node_id"],
-            amount=cancel_amount,
-            direction="outflow"
-        )
-        
-        result = {
-            "status": event_type,
-            "motion": motion,
-            "amount": cancel_amount,
-            "processed": True
-        }
+        amount = float(data.get("cancels", [{}])[0].get("cancelAmount", 0)) if data.get("cancels") else cleaned["value"]
+        background_tasks.add_task(run_logged, _process_outflow, cleaned["node_id"], amount)
+    
+    else:
+        return {"status": event_type, "processed": False}
     
-    return result
+    return {
+        "status": event_type,
+        "amount": amount,
+        "accepted": True
+    }
 
 
 @router.post("/virtual-account")
-async def toss_virtual_account_webhook(request: Request):
+async def toss_virtual_account_webhook(request: Request, background_tasks: BackgroundTasks):
     """
     가상계좌 입금 확인 웹훅 (수수료 0%)
     
@@ -101,25 +97,11 @@ async def toss_virtual_account_webhook(request: Request):
         "fee": 0  # 수수료 0%
     }
     
-    # 노드 생성/업데이트
-    node = await neo4j.upsert_node(
-        external_id=cleaned["node_id"],
-        source="toss_va"
-    )
-    
-    # inflow 모션 생성
-    motion = await neo4j.create_motion(
-        source_id=cleaned["node_id"],
-        target_id="owner",
-        amount=cleaned["value"],
-        direction="inflow"
-    )
+    background_tasks.add_task(run_logged, _process_inflow, cleaned["node_id"], cleaned["value"], "toss_va")
     
     return {
         "status": "DONE",
         "method": "virtual_account",
         "fee": 0,
-        "node": node,
-        "motion": motion,
-        "processed": True
+        "accepted": True
     }
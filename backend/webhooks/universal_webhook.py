@@ -1,60 +1,69 @@
 # backend/webhooks/universal_webhook.py
 # 범용 웹훅 - 자동 소스 감지 + WebSocket 실시간 전송
 
-from fastapi import APIRouter, Request, Header
-from typing import Optional
-from integrations.zero_meaning import ZeroMeaningCleaner
-from integrations.neo4j_client import Neo4jClient
+import asyncio
+import json
+import re
+from fastapi import APIRouter, Request, BackgroundTasks
+from typing import Mapping
+from integrations.zero_meaning import cleaner
+from integrations.neo4j_client import neo4j
+from webhooks.dedup import cleanse_cache
+from webhooks.tasks import run_logged
 from websocket import (
-    broadcast_node_update,
+    broadcast_inflow_update,
     broadcast_motion_update,
     broadcast_webhook_received
 )
 
 router = APIRouter()
-cleaner = ZeroMeaningCleaner()
-neo4j = Neo4jClient()
 
-def detect_source(headers: dict, data: dict) -> str:
+# 소스 감지 테이블 (센티널 헤더 → 소스)
+_HEADER_SOURCE = {
+    "stripe-signature": "stripe",
+    "x-shopify-hmac-sha256": "shopify",
+    "x-quickbooks-signature": "quickbooks",
+    "x-paddle-signature": "paddle",
+}
+
+# 센티널 데이터 키 조합 → 소스
+_DATA_SOURCE = (
+    (("livemode", "api_version"), "stripe"),
+    (("admin_graphql_api_id",), "shopify"),
+    (("realmId",), "quickbooks"),
+    (("event_type", "passthrough"), "paddle"),
+)
+
+def detect_source(headers: Mapping[str, str], data: dict) -> str:
     """웹훅 소스 자동 감지"""
     # Header 기반 감지
-    if "stripe-signature" in headers:
-        return "stripe"
-    if "x-shopify-hmac-sha256" in headers:
-        return "shopify"
-    if "x-quickbooks-signature" in headers:
-        return "quickbooks"
-    if "x-paddle-signature" in headers:
-        return "paddle"
+    for header, source in _HEADER_SOURCE.items():
+        if headers.get(header):
+            return source
     
     # Data 기반 감지
-    if "livemode" in data and "api_version" in data:
-        return "stripe"
-    if "admin_graphql_api_id" in data:
-        return "shopify"
-    if "realmId" in data:
-        return "quickbooks"
-    if "event_type" in data and "passthrough" in data:
-        return "paddle"
+    for keys, source in _DATA_SOURCE:
+        if all(k in data for k in keys):
+            return source
     
     return "unknown"
 
+# Flow 방향 키워드 (단일 정규식으로 사전 컴파일)
+_INFLOW_KEYWORDS = ("succeeded", "paid", "completed", "create", "payment")
+_OUTFLOW_KEYWORDS = ("refund", "cancel", "void", "chargeback")
+_INFLOW_RE = re.compile("|".join(_INFLOW_KEYWORDS))
+_OUTFLOW_RE = re.compile("|".join(_OUTFLOW_KEYWORDS))
+
 def detect_flow_type(data: dict, source: str) -> str:
     """이벤트 타입으로 flow 방향 감지"""
-    event = data.get("type", "") or data.get("topic", "") or data.get("event_type", "")
+    event_lower = (data.get("type") or data.get("topic") or data.get("event_type") or "").lower()
     
-    inflow_keywords = ["succeeded", "paid", "completed", "create", "payment"]
-    outflow_keywords = ["refund", "cancel", "void", "chargeback"]
+    # outflow 우선 (예: "refund.payment"는 outflow)
+    if _OUTFLOW_RE.search(event_lower):
+        return "outflow"
     
-    event_lower = event.lower()
-    
-    for keyword in outflow_keywords:
-        if keyword in event_lower:
-            return "outflow"
-    
-    for keyword in inflow_keywords:
-        if keyword in event_lower:
-            return "inflow"
+    if _INFLOW_RE.search(event_lower):
+        return "inflow"
     
     # 금액 기반 추론
     amount = data.get("amount") or data.get("total") or data.get("total_price", 0)
@@ -63,12 +72,50 @@ def detect_flow_type(data: dict, source: str) -> str:
     
     return "unknown"
 
+async def _process_inflow(cleaned: dict, source: str):
+    """inflow: 노드 생성/업데이트 + 모션 + 실시간 전송"""
+    await neo4j.upsert_node(
+        external_id=cleaned["node_id"],
+        source=source
+    )
+    
+    await neo4j.create_motion(
+        source_id=cleaned["node_id"],
+        target_id="owner",
+        amount=cleaned["value"],
+        direction="inflow"
+    )
+    
+    # 🔴 WebSocket 실시간 전송
+    await asyncio.gather(
+        broadcast_inflow_update(cleaned["node_id"], cleaned["value"], source),
+        broadcast_webhook_received(source, "inflow", cleaned["value"])
+    )
+
+async def _process_outflow(cleaned: dict, source: str):
+    """outflow: 모션 + 실시간 전송"""
+    await neo4j.create_motion(
+        source_id="owner",
+        target_id=cleaned["node_id"],
+        amount=cleaned["value"],
+        direction="outflow"
+    )
+    
+    # 🔴 WebSocket 실시간 전송
+    await asyncio.gather(
+        broadcast_motion_update("owner", cleaned["node_id"], cleaned["value"]),
+        broadcast_webhook_received(source, "outflow", cleaned["value"])
+    )
+
+_FLOW_HANDLERS = {
+    "inflow": _process_inflow,
+    "outflow": _process_outflow,
+}
+
 @router.post("")
 async def universal_webhook(
     request: Request,
-    stripe_signature: Optional[str] = Header(None, alias="stripe-signature"),
-    x_shopify_hmac: Optional[str] = Header(None, alias="x-shopify-hmac-sha256"),
-    x_shopify_topic: Optional[str] = Header(None, alias="x-shopify-topic")
+    background_tasks: BackgroundTasks
 ):
     """
     범용 웹훅 엔드포인트
@@ -77,22 +124,19 @@ async def universal_webhook(
     1. 소스 자동 감지 (Stripe, Shopify, QuickBooks 등)
     2. Zero Meaning 정제
     3. Flow 타입 감지 (inflow/outflow)
-    4. 노드/모션 자동 생성
+    4. 노드/모션 자동 생성 (응답 후 백그라운드)
     """
-    import json
-    
     payload = await request.body()
     data = json.loads(payload)
     
-    # 헤더 수집
-    headers = {
-        "stripe-signature": stripe_signature,
-        "x-shopify-hmac-sha256": x_shopify_hmac,
-        "x-shopify-topic": x_shopify_topic
-    }
-    
     # 1. 소스 감지
-    source = detect_source(headers, data)
+    source = detect_source(request.headers, data)
+    
+    # 재전송 중복 제거
+    cache_key = cleanse_cache.key(source, payload, request.headers.get("x-shopify-topic", ""))
+    cached = cleanse_cache.get(cache_key)
+    if cached is not None:
+        return {"source": source, "cleaned": cached, "deduped": True, "processed": False}
     
     # 2. Zero Meaning 정제
     cleaned = cleaner.cleanse(data, source=source)
@@ -100,52 +144,19 @@ async def universal_webhook(
     # 3. Flow 타입 감지
     flow_type = detect_flow_type(data, source)
     
-    # 4. 처리
+    # 4. 처리 (Neo4j 기록 + WebSocket 전송은 응답 후 백그라운드)
     result = {
         "source": source,
         "flow_type": flow_type,
-        "cleaned": cleaned,
-        "processed": False
+        "cleaned": cleaned
     }
     
-    if flow_type == "inflow":
-        # 노드 생성/업데이트
-        node = await neo4j.upsert_node(
-            external_id=cleaned["node_id"],
-            source=source
-        )
-        
-        # inflow 모션
-        motion = await neo4j.create_motion(
-            source_id=cleaned["node_id"],
-            target_id="owner",
-            amount=cleaned["value"],
-            direction="inflow"
-        )
-        
-        result["node"] = node
-        result["motion"] = motion
-        result["processed"] = True
-        
-        # 🔴 WebSocket 실시간 전송
-        await broadcast_node_update(cleaned["node_id"], cleaned["value"], source)
-        await broadcast_motion_update(cleaned["node_id"], "owner", cleaned["value"])
-        await broadcast_webhook_received(source, "inflow", cleaned["value"])
-    
-    elif flow_type == "outflow":
-        # outflow 모션
-        motion = await neo4j.create_motion(
-            source_id="owner",
-            target_id=cleaned["node_id"],
-            amount=cleaned["value"],
-            direction="outflow"
-        )
-        
-        result["motion"] = motion
-        result["processed"] = True
-        
-        # 🔴 WebSocket 실시간 전송
-        await broadcast_motion_update("owner", cleaned["node_id"], cleaned["value"])
-        await broadcast_webhook_received(source, "outflow", cleaned["value"])
+    handler = _FLOW_HANDLERS.get(flow_type)
+    if handler is None:
+        result["processed"] = False
+        return result
     
+    background_tasks.add_task(run_logged, handler, cleaned, source)
+    cleanse_cache.put(cache_key, cleaned)  # 접수된 이벤트만 캐시
+    result["accepted"] = True
     return result
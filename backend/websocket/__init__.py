@@ -7,6 +7,7 @@ from .manager import (
     ConnectionManager,
     broadcast_node_update,
     broadcast_motion_update,
+    broadcast_inflow_update,
     broadcast_synergy_update,
     broadcast_flywheel_pulse,
     broadcast_webhook_received
@@ -20,41 +21,10 @@ __all__ = [
     "ConnectionManager",
     "broadcast_node_update",
     "broadcast_motion_update",
+    "broadcast_inflow_update",
     "broadcast_synergy_update",
     "broadcast_flywheel_pulse",
     "broadcast_webhook_received",
     "router",
     "http_router"
 ]
-
-# backend/websocket/__init__.py
-# WebSocket 모듈
-
-from .manager import (
-    manager,
-    Message,
-    ConnectionManager,
-    broadcast_node_update,
-    broadcast_motion_update,
-    broadcast_synergy_update,
-    broadcast_flywheel_pulse,
-    broadcast_webhook_received
-)
-
-from .api import router, http_router
-
-__all__ = [
-    "manager",
-    "Message",
-    "ConnectionManager",
-    "broadcast_node_update",
-    "broadcast_motion_update",
-    "broadcast_synergy_update",
-    "broadcast_flywheel_pulse",
-    "broadcast_webhook_received",
-    "router",
-    "http_router"
-]
-
-
-
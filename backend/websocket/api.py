@@ -1,10 +1,10 @@
 # backend/websocket/api.py
 # WebSocket API 엔드포인트
 
-import uuid
+import os
 import json
-from typing import Optional
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+import logging
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from .manager import (
     manager, 
     Message,
@@ -13,14 +13,13 @@ from .manager import (
     broadcast_synergy_update
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
 
 
 @router.websocket("/physics-map")
-async def websocket_physics_map(
-    websocket: WebSocket,
-    client_id: Optional[str] = Query(None)
-):
+async def websocket_physics_map(websocket: WebSocket):
     """
     Physics Map 실시간 WebSocket
     
@@ -37,9 +36,9 @@ async def websocket_physics_map(
     - unsubscribe: 구독 해제
     - ping: 연결 확인
     """
-    cid = client_id or f"client_{uuid.uuid4().hex[:8]}"
+    cid = websocket.query_params.get("client_id") or f"client_{os.urandom(4).hex()}"
     
-    await manager.connect(websocket, cid, channels=["physics-map", "all"])
+    await manager.connect(websocket, cid, channels=["physics-map"])
     
     try:
         while True:
@@ -82,17 +81,14 @@ async def websocket_physics_map(
                 ))
     
     except WebSocketDisconnect:
-        manager.disconnect(cid)
-    except Exception as e:
-        print(f"WebSocket 에러 ({cid}): {e}")
-        manager.disconnect(cid)
+        manager.disconnect(cid, websocket)
+    except Exception:
+        logger.exception("WebSocket 에러 (%s)", cid)
+        manager.disconnect(cid, websocket)
 
 
 @router.websocket("/dashboard")
-async def websocket_dashboard(
-    websocket: WebSocket,
-    client_id: Optional[str] = Query(None)
-):
+async def websocket_dashboard(websocket: WebSocket):
     """
     대시보드 실시간 WebSocket
     
@@ -101,9 +97,9 @@ async def websocket_dashboard(
     - parasitic_progress: Parasitic 진행 상황
     - crewai_result: CrewAI 분석 결과
     """
-    cid = client_id or f"dash_{uuid.uuid4().hex[:8]}"
+    cid = websocket.query_params.get("client_id") or f"dash_{os.urandom(4).hex()}"
     
-    await manager.connect(websocket, cid, channels=["dashboard", "all"])
+    await manager.connect(websocket, cid, channels=["dashboard"])
     
     try:
         while True:
@@ -116,14 +112,11 @@ async def websocket_dashboard(
                 ))
     
     except WebSocketDisconnect:
-        manager.disconnect(cid)
+        manager.disconnect(cid, websocket)
 
 
 @router.websocket("/flywheel")
-async def websocket_flywheel(
-    websocket: WebSocket,
-    client_id: Optional[str] = Query(None)
-):
+async def websocket_flywheel(websocket: WebSocket):
     """
     Flywheel 실시간 WebSocket
     
@@ -131,9 +124,9 @@ async def websocket_flywheel(
     - flywheel_pulse: 플라이휠 단계 진행
     - momentum_update: 모멘텀 변화
     """
-    cid = client_id or f"fly_{uuid.uuid4().hex[:8]}"
+    cid = websocket.query_params.get("client_id") or f"fly_{os.urandom(4).hex()}"
     
-    await manager.connect(websocket, cid, channels=["flywheel", "all"])
+    await manager.connect(websocket, cid, channels=["flywheel"])
     
     try:
         while True:
@@ -146,7 +139,7 @@ async def websocket_flywheel(
                 ))
     
     except WebSocketDisconnect:
-        manager.disconnect(cid)
+        manager.disconnect(cid, websocket)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -2,300 +2,76 @@
 # WebSocket 연결 관리자
 
 import json
+import time
+import logging
 import asyncio
-from typing import Dict, List, Set, Optional, Any
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Any, Sequence, Set, Tuple
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
-from pydantic import BaseModel
 
+# orjson 선택적 사용 (없으면 표준 json 폴백, 출력 포맷 동일)
+try:
+    import orjson
 
-class Message(BaseModel):
-    """WebSocket 메시지"""
-    type: str  # node_update, motion_update, synergy_update, flywheel_pulse
-    data: Dict[str, Any]
-    timestamp: str = None
-    
-    def __init__(self, **data):
-        if not data.get('timestamp'):
-            data['timestamp'] = datetime.now().isoformat()
-        super().__init__(**data)
-
-
-class ConnectionManager:
-    """
-    WebSocket 연결 관리자
-    
-    기능:
-    - 다중 클라이언트 연결 관리
-    - 채널별 구독 (physics-map, dashboard, etc.)
-    - 브로드캐스트 / 특정 클라이언트 전송
-    - 자동 재연결 지원
-    """
-    
-    def __init__(self):
-        # 활성 연결: {client_id: WebSocket}
-        self.active_connections: Dict[str, WebSocket] = {}
-        
-        # 채널별 구독자: {channel: Set[client_id]}
-        self.channels: Dict[str, Set[str]] = {
-            "physics-map": set(),
-            "dashboard": set(),
-            "flywheel": set(),
-            "all": set()
-        }
-        
-        # 연결 메타데이터: {client_id: {connected_at, channels, ...}}
-        self.metadata: Dict[str, Dict] = {}
-        
-        # 메시지 큐 (재연결 시 전송용)
-        self.message_queue: Dict[str, List[Message]] = {}
-        
-        # 통계
-        self.stats = {
-            "total_connections": 0,
-            "total_messages": 0,
-            "messages_per_channel": {}
-        }
-    
-    async def connect(
-        self, 
-        websocket: WebSocket, 
-        client_id: str,
-        channels: List[str] = None
-    ):
-        """클라이언트 연결"""
-        await websocket.accept()
-        
-        self.active_connections[client_id] = websocket
-        self.metadata[client_id] = {
-            "connected_at": datetime.now().isoformat(),
-            "channels": channels or ["all"],
-            "message_count": 0
-        }
-        
-        # 채널 구독
-        subscribe_channels = channels or ["all"]
-        for channel in subscribe_channels:
-            if channel not in self.channels:
-                self.channels[channel] = set()
-            self.channels[channel].add(client_id)
-        
-        self.stats["total_connections"] += 1
-        
-        # 연결 성공 메시지
-        await self.send_personal(client_id, Message(
-            type="connected",
-            data={
-                "client_id": client_id,
-                "channels": subscribe_channels,
-                "server_time": datetime.now().isoformat()
-            }
-        ))
-        
-        # 큐에 있는 메시지 전송
-        if client_id in self.message_queue:
-            for msg in self.message_queue[client_id]:
-                await self.send_personal(client_id, msg)
-            del self.message_queue[client_id]
-        
-        print(f"✅ WebSocket 연결: {client_id} → {subscribe_channels}")
-    
-    def disconnect(self, client_id: str):
-        """클라이언트 연결 해제"""
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-        
-        # 모든 채널에서 제거
-        for channel in self.channels.values():
-            channel.discard(client_id)
-        
-        if client_id in self.metadata:
-            del self.metadata[client_id]
-        
-        print(f"❌ WebSocket 해제: {client_id}")
-    
-    async def send_personal(self, client_id: str, message: Message):
-        """특정 클라이언트에 전송"""
-        if client_id in self.active_connections:
-            try:
-                websocket = self.active_connections[client_id]
-                await websocket.send_json(message.dict())
-                
-                if client_id in self.metadata:
-                    self.metadata[client_id]["message_count"] += 1
-                
-                self.stats["total_messages"] += 1
-            except Exception as e:
-                print(f"전송 실패 ({client_id}): {e}")
-                self.disconnect(client_id)
-        else:
-            # 연결 없으면 큐에 저장
-            if client_id not in self.message_queue:
-                self.message_queue[client_id] = []
-            self.message_queue[client_id].append(message)
-    
-    async def broadcast(self, message: Message, channel: str = "all"):
-        """채널에 브로드캐스트"""
-        if channel not in self.channels:
-            return
-        
-        # 통계
-        if channel not in self.stats["messages_per_channel"]:
-            self.stats["messages_per_channel"][channel] = 0
-        self.stats["messages_per_channel"][channel] += 1
-        
-        # 채널 구독자들에게 전송
-        disconnected = []
-        for client_id in self.channels[channel]:
-            if client_id in self.active_connections:
-                try:
-                    websocket = self.active_connections[client_id]
-                    await websocket.send_json(message.dict())
-                    self.stats["total_messages"] += 1
-                except Exception as e:
-                    print(f"브로드캐스트 실패 ({client_id}): {e}")
-                    disconnected.append(client_id)
-        
-        # 실패한 연결 정리
-        for client_id in disconnected:
-            self.disconnect(client_id)
-    
-    async def broadcast_all(self, message: Message):
-        """모든 연결에 브로드캐스트"""
-        disconnected = []
-        for client_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message.dict())
-                self.stats["total_messages"] += 1
-            except Exception as e:
-                print(f"브로드캐스트 실패 ({client_id}): {e}")
-                disconnected.append(client_id)
-        
-        for client_id in disconnected:
-            self.disconnect(client_id)
-    
-    def get_stats(self) -> Dict:
-        """통계 반환"""
-        return {
-            **self.stats,
-            "active_connections": len(self.active_connections),
-            "channels": {k: len(v) for k, v in self.channels.items()}
-        }
-    
-    def get_clients(self) -> List[Dict]:
-        """연결된 클라이언트 목록"""
-        return [
-            {
-                "client_id": cid,
-                **self.metadata.get(cid, {})
-            }
-            for cid in self.active_connections.keys()
-        ]
+    def _encode(obj: Any) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    def _encode(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
 
+logger = logging.getLogger(__name__)
 
-# 글로벌 매니저 인스턴스
-manager = ConnectionManager()
+# 클라이언트별 송신 큐 크기 (가득 차면 느린 클라이언트로 보고 연결 해제)
+CLIENT_QUEUE_SIZE = 256
 
+# 느린 클라이언트 해제 시 close 코드 (Try Again Later → 클라이언트 재연결 유도)
+WS_CLOSE_TRY_AGAIN_LATER = 1013
 
-# ═══════════════════════════════════════════════════════════════
-# 편의 함수 (다른 모듈에서 import하여 사용)
-# ═══════════════════════════════════════════════════════════════
-
-async def broadcast_node_update(node_id: str, value: float, source: str = "webhook"):
-    """노드 업데이트 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="node_update",
-            data={
-                "node_id": node_id,
-                "value": value,
-                "source": source,
-                "action": "pulse"  # 프론트엔드에서 펄스 애니메이션
-            }
-        ),
-        channel="physics-map"
-    )
+# 같은 ID 재연결로 교체된 이전 소켓의 close 코드 (애플리케이션 정의 4000번대)
+WS_CLOSE_REPLACED = 4000
 
+# 브로드캐스트 시 이벤트 루프 양보 단위 (대형 채널에서 다른 코루틴 지연 방지)
+BROADCAST_BATCH_SIZE = 64
 
-async def broadcast_motion_update(source_id: str, target_id: str, amount: float):
-    """모션(엣지) 업데이트 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="motion_update",
-            data={
-                "source": source_id,
-                "target": target_id,
-                "amount": amount,
-                "action": "flow"  # 프론트엔드에서 흐름 애니메이션
-            }
-        ),
-        channel="physics-map"
-    )
+# 오프라인 메시지 큐 (재연결 시 전송용): 클라이언트당 최대 개수 / 보관 시간 (초)
+OFFLINE_QUEUE_SIZE = 200
+OFFLINE_QUEUE_TTL = 600
 
 
-async def broadcast_synergy_update(synergy: float, total_value: float):
-    """시너지 업데이트 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="synergy_update",
-            data={
-                "synergy": synergy,
-                "total_value": total_value
-            }
-        ),
-        channel="physics-map"
-    )
+def now_ms() -> int:
+    """현재 시각 (epoch 밀리초 정수, JS Date와 호환 / datetime 생성 없음)"""
+    return time.time_ns() // 1_000_000
 
 
-async def broadcast_flywheel_pulse(stage: str, momentum: float):
-    """플라이휠 펄스 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="flywheel_pulse",
-            data={
-                "stage": stage,  # delete, automate, synergy, accelerate
-                "momentum": momentum
-            }
-        ),
-        channel="flywheel"
-    )
-
-
-async def broadcast_webhook_received(source: str, event_type: str, amount: float):
-    """Webhook 수신 브로드캐스트 (대시보드용)"""
-    await manager.broadcast(
-        Message(
-            type="webhook_received",
-            data={
-                "source": source,
-                "event_type": event_type,
-                "amount": amount
-            }
-        ),
-        channel="dashboard"
-    )
-
-# backend/websocket/manager.py
-# WebSocket 연결 관리자
-
-import json
-import asyncio
-from typing import Dict, List, Set, Optional, Any
-from datetime import datetime
-from fastapi import WebSocket, WebSocketDisconnect
-from pydantic import BaseModel
-
-
-class Message(BaseModel):
-    """WebSocket 메시지"""
+@dataclass(slots=True)
+class Message:
+    """WebSocket 메시지 (송신 전용 → 검증 없는 경량 dataclass)"""
     type: str  # node_update, motion_update, synergy_update, flywheel_pulse
     data: Dict[str, Any]
-    timestamp: str = None
+    timestamp: int = field(default_factory=now_ms)  # epoch ms
+    _encoded: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
-    def __init__(self, **data):
-        if not data.get('timestamp'):
-            data['timestamp'] = datetime.now().isoformat()
-        super().__init__(**data)
+    @property
+    def iso_timestamp(self) -> str:
+        """ISO 형식 타임스탬프 (필요할 때만 변환)"""
+        return datetime.fromtimestamp(self.timestamp / 1000).isoformat()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """전송용 dict"""
+        return {"type": self.type, "data": self.data, "timestamp": self.timestamp}
+    
+    def to_json(self) -> str:
+        """
+        전송용 JSON 문자열 (send_json과 동일한 compact/UTF-8 포맷)
+        
+        첫 호출 결과를 캐시 → 같은 메시지 재전송 시 재인코딩 없음
+        (인코딩 후 data를 수정하면 반영되지 않음)
+        """
+        if self._encoded is None:
+            self._encoded = _encode(self.to_dict())
+        return self._encoded
 
 
 class ConnectionManager:
@@ -313,19 +89,39 @@ class ConnectionManager:
         # 활성 연결: {client_id: WebSocket}
         self.active_connections: Dict[str, WebSocket] = {}
         
-        # 채널별 구독자: {channel: Set[client_id]}
-        self.channels: Dict[str, Set[str]] = {
-            "physics-map": set(),
-            "dashboard": set(),
-            "flywheel": set(),
-            "all": set()
+        # 채널별 구독자: {channel: [(client_id, 송신 큐), ...]}
+        # 연속 리스트 + 송신 큐 직접 보관 → 브로드캐스트 시 dict 조회 없음
+        self.channels: Dict[str, List[Tuple[str, asyncio.Queue]]] = {
+            "physics-map": [],
+            "dashboard": [],
+            "flywheel": [],
+            "all": []
         }
         
+        # 채널별 구독자 위치: {channel: {client_id: index}} (O(1) 멤버십/제거용)
+        self._channel_index: Dict[str, Dict[str, int]] = {
+            channel: {} for channel in self.channels
+        }
+        
+        # 채널별 실제 전송 대상 캐시: {channel: channel ∪ "all" 구독자 (중복 제거)}
+        # 구독 변경 시 무효화 → 브로드캐스트마다 합집합/복사 없음
+        self._effective: Dict[str, Tuple[Tuple[str, asyncio.Queue], ...]] = {}
+        
         # 연결 메타데이터: {client_id: {connected_at, channels, ...}}
         self.metadata: Dict[str, Dict] = {}
         
+        # 송신 큐 + writer 태스크: {client_id: Queue / Task}
+        self.outbox: Dict[str, asyncio.Queue] = {}
+        self.writers: Dict[str, asyncio.Task] = {}
+        
+        # 진행 중인 소켓 close 태스크 (완료 전 GC 방지)
+        self._closing: Set[asyncio.Task] = set()
+        
         # 메시지 큐 (재연결 시 전송용)
-        self.message_queue: Dict[str, List[Message]] = {}
+        # 인코딩된 문자열 보관, 오래된 것부터 밀려남 / 마지막 적재 후 TTL 지나면 정리
+        self.message_queue: Dict[str, Deque[str]] = {}
+        self._queue_touched: Dict[str, float] = {}
+        self._last_sweep = time.monotonic()
         
         # 통계
         self.stats = {
@@ -343,7 +139,18 @@ class ConnectionManager:
         """클라이언트 연결"""
         await websocket.accept()
         
+        # 같은 ID 재연결 → 이전 연결의 구독/writer 정리 + 소켓 닫은 후 새 연결로 교체
+        # (이전 엔드포인트 핸들러는 수신 끊김으로 종료)
+        if client_id in self.active_connections:
+            self._drop(client_id, WS_CLOSE_REPLACED)
+        
         self.active_connections[client_id] = websocket
+        
+        # 송신은 writer 태스크가 전담 (broadcast는 큐에 넣기만 함)
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.outbox[client_id] = queue
+        self.writers[client_id] = asyncio.create_task(self._writer(client_id, websocket, queue))
+        
         self.metadata[client_id] = {
             "connected_at": datetime.now().isoformat(),
             "channels": channels or ["all"],
@@ -353,9 +160,7 @@ class ConnectionManager:
         # 채널 구독
         subscribe_channels = channels or ["all"]
         for channel in subscribe_channels:
-            if channel not in self.channels:
-                self.channels[channel] = set()
-            self.channels[channel].add(client_id)
+            self._subscribe(channel, client_id, queue)
         
         self.stats["total_connections"] += 1
         
@@ -369,87 +174,229 @@ class ConnectionManager:
             }
         ))
         
-        # 큐에 있는 메시지 전송
-        if client_id in self.message_queue:
-            for msg in self.message_queue[client_id]:
-                await self.send_personal(client_id, msg)
-            del self.message_queue[client_id]
+        # 큐에 있는 메시지 전송 (OFFLINE_QUEUE_SIZE < CLIENT_QUEUE_SIZE 이므로 넘치지 않음)
+        pending = self.message_queue.pop(client_id, ())
+        self._queue_touched.pop(client_id, None)
+        for payload in pending:
+            queue.put_nowait(payload)
+        self.metadata[client_id]["message_count"] += len(pending)
         
-        print(f"✅ WebSocket 연결: {client_id} → {subscribe_channels}")
+        logger.debug("WebSocket 연결: %s → %s", client_id, subscribe_channels)
     
-    def disconnect(self, client_id: str):
-        """클라이언트 연결 해제"""
+    def disconnect(self, client_id: str, websocket: Optional[WebSocket] = None):
+        """
+        클라이언트 연결 해제
+        
+        websocket 지정 시 현재 연결이 그 소켓일 때만 해제
+        (같은 ID로 재연결된 뒤 이전 핸들러가 종료해도 새 연결은 유지)
+        """
+        if websocket is not None and self.active_connections.get(client_id) is not websocket:
+            return
+        
         if client_id in self.active_connections:
             del self.active_connections[client_id]
         
-        # 모든 채널에서 제거
-        for channel in self.channels.values():
-            channel.discard(client_id)
+        # 구독한 채널에서만 제거 (전체 채널 순회 없음)
+        meta = self.metadata.pop(client_id, None)
+        if meta is not None:
+            for channel in meta["channels"]:
+                self._unsubscribe(channel, client_id)
         
-        if client_id in self.metadata:
-            del self.metadata[client_id]
+        # writer 태스크 정리 (writer 자신이 호출한 경우 제외)
+        self.outbox.pop(client_id, None)
+        writer = self.writers.pop(client_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+        
+        logger.debug("WebSocket 해제: %s", client_id)
+    
+    def _drop(self, client_id: str, code: int = WS_CLOSE_TRY_AGAIN_LATER):
+        """
+        연결 해제 + 소켓 닫기
+        
+        disconnect만 하면 엔드포인트는 계속 수신 대기 → 클라이언트는 끊김을 모른 채
+        브로드캐스트/pong을 못 받음. 소켓을 닫아 클라이언트가 재연결하도록 함
+        """
+        websocket = self.active_connections.get(client_id)
+        self.disconnect(client_id)
+        if websocket is not None:
+            task = asyncio.create_task(self._close(websocket, code))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+    
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int):
+        """소켓 닫기 (이미 닫힌 소켓은 무시)"""
+        try:
+            await websocket.close(code=code)
+        except Exception as e:
+            logger.debug("소켓 닫기 실패: %s", e)
+    
+    def _subscribe(self, channel: str, client_id: str, queue: asyncio.Queue):
+        """채널 구독 (중복 무시)"""
+        if channel not in self.channels:
+            self.channels[channel] = []
+            self._channel_index[channel] = {}
+        
+        index = self._channel_index[channel]
+        if client_id not in index:
+            index[client_id] = len(self.channels[channel])
+            self.channels[channel].append((client_id, queue))
+            self._invalidate(channel)
+    
+    def _unsubscribe(self, channel: str, client_id: str):
+        """채널 구독 해제 (마지막 원소와 swap 후 pop → O(1))"""
+        position = self._channel_index[channel].pop(client_id, None)
+        if position is None:
+            return
         
-        print(f"❌ WebSocket 해제: {client_id}")
+        subscribers = self.channels[channel]
+        last = subscribers.pop()
+        if position < len(subscribers):
+            subscribers[position] = last
+            self._channel_index[channel][last[0]] = position
+        self._invalidate(channel)
+    
+    def _invalidate(self, channel: str):
+        """전송 대상 캐시 무효화 ("all" 변경은 모든 채널에 영향)"""
+        if channel == "all":
+            self._effective.clear()
+        else:
+            self._effective.pop(channel, None)
+    
+    def _targets(self, channel: str) -> Tuple[Tuple[str, asyncio.Queue], ...]:
+        """
+        채널 전송 대상: 채널 구독자 + "all" 구독자 (양쪽 구독 시 1회만)
+        
+        "all" 채널 자체로 보내면 구독 여부와 무관하게 모든 연결 (broadcast 기본값)
+        """
+        if channel == "all":
+            return tuple(self.outbox.items())
+        
+        targets = self._effective.get(channel)
+        if targets is None:
+            index = self._channel_index[channel]
+            extra = tuple(
+                entry for entry in self.channels["all"] if entry[0] not in index
+            )
+            targets = tuple(self.channels[channel]) + extra
+            self._effective[channel] = targets
+        return targets
+    
+    async def _writer(self, client_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """송신 큐 → WebSocket (클라이언트당 1개, 느린 클라이언트가 다른 클라이언트를 막지 않음)"""
+        try:
+            while True:
+                payload = await queue.get()
+                await websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("전송 실패 (%s): %s", client_id, e)
+            # 같은 ID로 재연결된 경우 이 writer는 이전 연결 → 현재 연결은 건드리지 않음
+            if self.writers.get(client_id) is asyncio.current_task():
+                self.disconnect(client_id)
     
     async def send_personal(self, client_id: str, message: Message):
         """특정 클라이언트에 전송"""
-        if client_id in self.active_connections:
+        if client_id in self.outbox:
             try:
-                websocket = self.active_connections[client_id]
-                await websocket.send_json(message.dict())
+                self.outbox[client_id].put_nowait(message.to_json())
+                self.stats["total_messages"] += 1
                 
                 if client_id in self.metadata:
                     self.metadata[client_id]["message_count"] += 1
-                
-                self.stats["total_messages"] += 1
-            except Exception as e:
-                print(f"전송 실패 ({client_id}): {e}")
-                self.disconnect(client_id)
+            except asyncio.QueueFull:
+                logger.warning("송신 큐 초과 (%s)", client_id)
+                self._drop(client_id)
         else:
             # 연결 없으면 큐에 저장
+            now = time.monotonic()
+            self._sweep_offline(now)
+            
             if client_id not in self.message_queue:
-                self.message_queue[client_id] = []
-            self.message_queue[client_id].append(message)
+                self.message_queue[client_id] = deque(maxlen=OFFLINE_QUEUE_SIZE)
+            self.message_queue[client_id].append(message.to_json())
+            self._queue_touched[client_id] = now
+    
+    def _sweep_offline(self, now: float):
+        """재연결하지 않는 클라이언트의 오프라인 큐 정리 (TTL 주기로 최대 1회)"""
+        if now - self._last_sweep < OFFLINE_QUEUE_TTL:
+            return
+        self._last_sweep = now
+        
+        expired = [
+            client_id for client_id, touched in self._queue_touched.items()
+            if now - touched > OFFLINE_QUEUE_TTL
+        ]
+        for client_id in expired:
+            del self.message_queue[client_id]
+            del self._queue_touched[client_id]
     
     async def broadcast(self, message: Message, channel: str = "all"):
-        """채널에 브로드캐스트"""
+        """채널에 브로드캐스트 (channel="all" → 모든 연결)"""
+        # 한 번만 직렬화 후 모든 구독자에 동일 문자열 전송
+        await self.broadcast_payload(message.to_json(), channel)
+    
+    async def broadcast_payload(self, payload: str, channel: str = "all"):
+        """인코딩된 메시지를 채널에 브로드캐스트"""
         if channel not in self.channels:
             return
         
         # 통계
-        if channel not in self.stats["messages_per_channel"]:
-            self.stats["messages_per_channel"][channel] = 0
-        self.stats["messages_per_channel"][channel] += 1
+        per_channel = self.stats["messages_per_channel"]
+        per_channel[channel] = per_channel.get(channel, 0) + 1
         
-        # 채널 구독자들에게 전송
-        disconnected = []
-        for client_id in self.channels[channel]:
-            if client_id in self.active_connections:
-                try:
-                    websocket = self.active_connections[client_id]
-                    await websocket.send_json(message.dict())
-                    self.stats["total_messages"] += 1
-                except Exception as e:
-                    print(f"브로드캐스트 실패 ({client_id}): {e}")
-                    disconnected.append(client_id)
-        
-        # 실패한 연결 정리
-        for client_id in disconnected:
-            self.disconnect(client_id)
+        # 채널 구독자 송신 큐에 넣기만 함 (실제 전송은 각 writer 태스크)
+        await self._enqueue_many(self._targets(channel), payload)
+    
+    async def broadcast_many(self, messages: Sequence[Message], channel: str = "all"):
+        """여러 메시지를 batch 프레임 하나로 묶어 채널에 브로드캐스트"""
+        await self.broadcast_payloads([message.to_json() for message in messages], channel)
+    
+    async def broadcast_payloads(self, payloads: Sequence[str], channel: str = "all"):
+        """
+        인코딩된 메시지 여러 개를 batch 프레임 하나로 브로드캐스트
+        
+        {"type": "batch", "events": [메시지, ...]} → 구독자당 큐 적재/소켓 전송 1회
+        (클라이언트는 events를 순서대로 개별 메시지처럼 처리)
+        """
+        if len(payloads) == 1:
+            await self.broadcast_payload(payloads[0], channel)
+        elif payloads:
+            await self.broadcast_payload(
+                '{"type":"batch","events":[' + ",".join(payloads) + "]}", channel
+            )
     
     async def broadcast_all(self, message: Message):
         """모든 연결에 브로드캐스트"""
+        payload = message.to_json()
+        await self._enqueue_many(tuple(self.outbox.items()), payload)
+    
+    async def _enqueue_many(self, targets: Sequence[Tuple[str, asyncio.Queue]], payload: str):
+        """여러 클라이언트 송신 큐에 추가, 큐가 가득 찬 (느린) 클라이언트는 해제 + 소켓 닫기"""
         disconnected = []
-        for client_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message.dict())
-                self.stats["total_messages"] += 1
-            except Exception as e:
-                print(f"브로드캐스트 실패 ({client_id}): {e}")
-                disconnected.append(client_id)
-        
-        for client_id in disconnected:
-            self.disconnect(client_id)
+        for start in range(0, len(targets), BROADCAST_BATCH_SIZE):
+            # 배치 사이마다 이벤트 루프 양보 (작은 채널은 양보 없이 한 번에)
+            if start:
+                await asyncio.sleep(0)
+            
+            for client_id, queue in targets[start:start + BROADCAST_BATCH_SIZE]:
+                try:
+                    queue.put_nowait(payload)
+                except asyncio.QueueFull:
+                    disconnected.append((client_id, queue))
+        
+        # 통계는 루프 밖에서 한 번에 반영 (구독자마다 dict 갱신 없음)
+        self.stats["total_messages"] += len(targets) - len(disconnected)
+        
+        # 느린 연결 정리 (건별 로그 대신 한 번에 기록)
+        if disconnected:
+            logger.warning("송신 큐 초과 %d개 연결 해제: %s", len(disconnected), [cid for cid, _ in disconnected])
+        for client_id, queue in disconnected:
+            # 배치 사이 양보 중 재연결됐으면 새 연결은 유지
+            if self.outbox.get(client_id) is queue:
+                self._drop(client_id)
     
     def get_stats(self) -> Dict:
         """통계 반환"""
@@ -478,79 +425,80 @@ manager = ConnectionManager()
 # 편의 함수 (다른 모듈에서 import하여 사용)
 # ═══════════════════════════════════════════════════════════════
 
+# 함수별 JSON 템플릿 (고정 형태 → dict/Message 생성 없이 값만 끼워 넣음)
+# 값 자리(%s)는 _encode로 JSON 이스케이프, 마지막 %d는 타임스탬프 (epoch ms)
+_NODE_UPDATE = (
+    '{"type":"node_update","data":{"node_id":%s,"value":%s,"source":%s,'
+    '"action":"pulse"},"timestamp":%d}'  # 프론트엔드에서 펄스 애니메이션
+)
+_MOTION_UPDATE = (
+    '{"type":"motion_update","data":{"source":%s,"target":%s,"amount":%s,'
+    '"action":"flow"},"timestamp":%d}'  # 프론트엔드에서 흐름 애니메이션
+)
+_SYNERGY_UPDATE = (
+    '{"type":"synergy_update","data":{"synergy":%s,"total_value":%s},"timestamp":%d}'
+)
+_FLYWHEEL_PULSE = (
+    # stage: delete, automate, synergy, accelerate
+    '{"type":"flywheel_pulse","data":{"stage":%s,"momentum":%s},"timestamp":%d}'
+)
+_WEBHOOK_RECEIVED = (
+    '{"type":"webhook_received","data":{"source":%s,"event_type":%s,"amount":%s},'
+    '"timestamp":%d}'
+)
+
+
+def _render(template: str, *values: Any) -> str:
+    """JSON 템플릿에 값/타임스탬프를 채운 전송용 문자열"""
+    return template % (*map(_encode, values), now_ms())
+
+
 async def broadcast_node_update(node_id: str, value: float, source: str = "webhook"):
     """노드 업데이트 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="node_update",
-            data={
-                "node_id": node_id,
-                "value": value,
-                "source": source,
-                "action": "pulse"  # 프론트엔드에서 펄스 애니메이션
-            }
-        ),
+    await manager.broadcast_payload(
+        _render(_NODE_UPDATE, node_id, value, source),
         channel="physics-map"
     )
 
 
 async def broadcast_motion_update(source_id: str, target_id: str, amount: float):
     """모션(엣지) 업데이트 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="motion_update",
-            data={
-                "source": source_id,
-                "target": target_id,
-                "amount": amount,
-                "action": "flow"  # 프론트엔드에서 흐름 애니메이션
-            }
-        ),
+    await manager.broadcast_payload(
+        _render(_MOTION_UPDATE, source_id, target_id, amount),
+        channel="physics-map"
+    )
+
+
+async def broadcast_inflow_update(node_id: str, amount: float, source: str = "webhook"):
+    """유입 이벤트 (노드 펄스 + 노드→owner 흐름)를 batch 프레임 하나로 브로드캐스트"""
+    await manager.broadcast_payloads(
+        [
+            _render(_NODE_UPDATE, node_id, amount, source),
+            _render(_MOTION_UPDATE, node_id, "owner", amount),
+        ],
         channel="physics-map"
     )
 
 
 async def broadcast_synergy_update(synergy: float, total_value: float):
     """시너지 업데이트 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="synergy_update",
-            data={
-                "synergy": synergy,
-                "total_value": total_value
-            }
-        ),
+    await manager.broadcast_payload(
+        _render(_SYNERGY_UPDATE, synergy, total_value),
         channel="physics-map"
     )
 
 
 async def broadcast_flywheel_pulse(stage: str, momentum: float):
     """플라이휠 펄스 브로드캐스트"""
-    await manager.broadcast(
-        Message(
-            type="flywheel_pulse",
-            data={
-                "stage": stage,  # delete, automate, synergy, accelerate
-                "momentum": momentum
-            }
-        ),
+    await manager.broadcast_payload(
+        _render(_FLYWHEEL_PULSE, stage, momentum),
         channel="flywheel"
     )
 
 
 async def broadcast_webhook_received(source: str, event_type: str, amount: float):
     """Webhook 수신 브로드캐스트 (대시보드용)"""
-    await manager.broadcast(
-        Message(
-            type="webhook_received",
-            data={
-                "source": source,
-                "event_type": event_type,
-                "amount": amount
-            }
-        ),
+    await manager.broadcast_payload(
+        _render(_WEBHOOK_RECEIVED, source, event_type, amount),
         channel="dashboard"
     )
-
-
-
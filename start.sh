@@ -36,4 +36,4 @@ echo ""
 
 # 서버 실행
 cd backend
-uvicorn main:app --reload --host 0.0.0.0 --port 8000
+uvicorn main:app --reload --host 0.0.0.0 --port 8000 --ws-per-message-deflate false
@@ -1,226 +1,276 @@
 # tests/conftest.py
 # Pytest 공통 설정 및 Fixtures
 
+import base64
+import hashlib
+import hmac
+
 import pytest
-import sys
-import os
+import pytest_asyncio
 
-# 백엔드 경로 추가
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+# 백엔드 경로는 pytest.ini의 pythonpath로 추가 (테스트 파일별 sys.path 조작 불필요)
 
 
-@pytest.fixture
-def sample_stripe_payload():
-    """Stripe Webhook 샘플 페이로드"""
-    return {
-        "id": "evt_test_123",
-        "type": "payment_intent.succeeded",
-        "data": {
-            "object": {
-                "id": "pi_test_456",
-                "customer": "cus_test_789",
-                "amount": 5000,
-                "currency": "usd",
-                "description": "Test payment",
-                "metadata": {"order_id": "order_123"}
-            }
+class _FrozenDict(dict):
+    """
+    읽기 전용 dict
+
+    세션 공유 샘플 데이터가 테스트 중 수정되면 즉시 TypeError
+    (MappingProxyType은 isinstance(x, dict) 검사를 통과하지 못해 dict 서브클래스로 구현)
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("샘플 fixture는 읽기 전용 (수정하려면 copy 후 사용)")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+def _freeze(value):
+    """샘플 데이터 읽기 전용 변환 (dict → _FrozenDict, list → tuple, 중첩 포함)"""
+    if isinstance(value, dict):
+        return _FrozenDict({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+_SAMPLE_STRIPE_PAYLOAD = _freeze({
+    "id": "evt_test_123",
+    "type": "payment_intent.succeeded",
+    "data": {
+        "object": {
+            "id": "pi_test_456",
+            "customer": "cus_test_789",
+            "amount": 5000,
+            "currency": "usd",
+            "description": "Test payment",
+            "metadata": {"order_id": "order_123"}
         }
     }
+})
+
+
+@pytest.fixture(scope="session")
+def sample_stripe_payload():
+    """Stripe Webhook 샘플 페이로드"""
+    return _SAMPLE_STRIPE_PAYLOAD
+
+
+_SAMPLE_SHOPIFY_PAYLOAD = _freeze({
+    "id": 123456789,
+    "order_number": 1001,
+    "customer": {
+        "id": 987654321,
+        "email": "test@example.com",
+        "first_name": "John",
+        "last_name": "Doe"
+    },
+    "total_price": "100.00",
+    "currency": "USD",
+    "created_at": "2026-01-02T00:00:00Z"
+})
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_shopify_payload():
     """Shopify Webhook 샘플 페이로드"""
-    return {
-        "id": 123456789,
-        "order_number": 1001,
-        "customer": {
-            "id": 987654321,
-            "email": "test@example.com",
-            "first_name": "John",
-            "last_name": "Doe"
-        },
-        "total_price": "100.00",
-        "currency": "USD",
-        "created_at": "2026-01-02T00:00:00Z"
-    }
+    return _SAMPLE_SHOPIFY_PAYLOAD
+
 
+_SAMPLE_TOSS_PAYLOAD = _freeze({
+    "paymentKey": "toss_pay_123",
+    "orderId": "order_456",
+    "status": "DONE",
+    "totalAmount": 50000,
+    "method": "카드",
+    "approvedAt": "2026-01-02T00:00:00+09:00"
+})
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def sample_toss_payload():
     """토스 Webhook 샘플 페이로드"""
-    return {
-        "paymentKey": "toss_pay_123",
-        "orderId": "order_456",
-        "status": "DONE",
-        "totalAmount": 50000,
-        "method": "카드",
-        "approvedAt": "2026-01-02T00:00:00+09:00"
-    }
+    return _SAMPLE_TOSS_PAYLOAD
 
 
-@pytest.fixture
+_SAMPLE_NODES = _freeze([
+    {"id": "node_1", "value": 100000},
+    {"id": "node_2", "value": 50000},
+    {"id": "node_3", "value": -10000},
+    {"id": "node_4", "value": 0},
+    {"id": "node_5", "value": 200000}
+])
+
+
+@pytest.fixture(scope="session")
 def sample_nodes():
     """샘플 노드 데이터"""
-    return [
-        {"id": "node_1", "value": 100000},
-        {"id": "node_2", "value": 50000},
-        {"id": "node_3", "value": -10000},
-        {"id": "node_4", "value": 0},
-        {"id": "node_5", "value": 200000}
-    ]
+    return _SAMPLE_NODES
+
+
+_SAMPLE_MOTIONS = _freeze([
+    {"source": "node_1", "target": "node_2", "amount": 10000},
+    {"source": "node_1", "target": "node_2", "amount": 15000},
+    {"source": "node_2", "target": "node_3", "amount": 5000},
+    {"source": "node_1", "target": "node_2", "amount": 20000},
+    {"source": "node_3", "target": "node_4", "amount": 3000}
+])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_motions():
     """샘플 모션 데이터"""
-    return [
-        {"source": "node_1", "target": "node_2", "amount": 10000},
-        {"source": "node_1", "target": "node_2", "amount": 15000},
-        {"source": "node_2", "target": "node_3", "amount": 5000},
-        {"source": "node_1", "target": "node_2", "amount": 20000},
-        {"source": "node_3", "target": "node_4", "amount": 3000}
-    ]
+    return _SAMPLE_MOTIONS
 
 
-@pytest.fixture
+_SAMPLE_ERP_DATA = _freeze({
+    "student_id": "STU_001",
+    "student_name": "홍길동",
+    "tuition": 300000,
+    "payment": 300000,
+    "created_at": "2026-01-02T00:00:00"
+})
+
+
+@pytest.fixture(scope="session")
 def sample_erp_data():
     """샘플 ERP 데이터 (하이클래스)"""
-    return {
-        "student_id": "STU_001",
-        "student_name": "홍길동",
-        "tuition": 300000,
-        "payment": 300000,
-        "created_at": "2026-01-02T00:00:00"
+    return _SAMPLE_ERP_DATA
+
+
+_SAMPLE_CRM_DATA = _freeze({
+    "id": "contact_123",
+    "properties": {
+        "hs_contact_id": "456",
+        "hs_deal_amount": "1000000",
+        "firstname": "John",
+        "lastname": "Doe",
+        "email": "john@example.com",
+        "createdate": "2026-01-02T00:00:00Z"
     }
+})
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_crm_data():
     """샘플 CRM 데이터 (HubSpot)"""
-    return {
-        "id": "contact_123",
-        "properties": {
-            "hs_contact_id": "456",
-            "hs_deal_amount": "1000000",
-            "firstname": "John",
-            "lastname": "Doe",
-            "email": "john@example.com",
-            "createdate": "2026-01-02T00:00:00Z"
-        }
-    }
+    return _SAMPLE_CRM_DATA
 
-# tests/conftest.py
-# Pytest 공통 설정 및 Fixtures
 
-import pytest
-import sys
-import os
+# 서명 테스트용 raw bytes (검증 함수가 bytes secret을 그대로 받음 → 호출마다 encode 없음)
+_WEBHOOK_PAYLOAD = b'{"test": "data"}'
+_STRIPE_SECRET = b"whsec_test_secret"
+_SHOPIFY_SECRET = b"shpss_test_secret"
+_STRIPE_TIMESTAMP = b"1234567890"
 
-# 백엔드 경로 추가
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
+@pytest.fixture(scope="session")
+def stripe_signed_payload():
+    """서명된 Stripe 웹훅 (payload, Stripe-Signature 헤더, secret) - 세션당 1회 서명"""
+    sig = hmac.digest(_STRIPE_SECRET, _STRIPE_TIMESTAMP + b"." + _WEBHOOK_PAYLOAD, hashlib.sha256).hex()
+    return _WEBHOOK_PAYLOAD, f"t={_STRIPE_TIMESTAMP.decode()},v1={sig}", _STRIPE_SECRET
 
-@pytest.fixture
-def sample_stripe_payload():
-    """Stripe Webhook 샘플 페이로드"""
-    return {
-        "id": "evt_test_123",
-        "type": "payment_intent.succeeded",
-        "data": {
-            "object": {
-                "id": "pi_test_456",
-                "customer": "cus_test_789",
-                "amount": 5000,
-                "currency": "usd",
-                "description": "Test payment",
-                "metadata": {"order_id": "order_123"}
-            }
-        }
-    }
 
+@pytest.fixture(scope="session")
+def shopify_signed_payload():
+    """서명된 Shopify 웹훅 (payload, X-Shopify-Hmac-Sha256 값, secret) - 세션당 1회 서명"""
+    digest = base64.b64encode(hmac.digest(_SHOPIFY_SECRET, _WEBHOOK_PAYLOAD, hashlib.sha256)).decode()
+    return _WEBHOOK_PAYLOAD, digest, _SHOPIFY_SECRET
 
-@pytest.fixture
-def sample_shopify_payload():
-    """Shopify Webhook 샘플 페이로드"""
-    return {
-        "id": 123456789,
-        "order_number": 1001,
-        "customer": {
-            "id": 987654321,
-            "email": "test@example.com",
-            "first_name": "John",
-            "last_name": "Doe"
-        },
-        "total_price": "100.00",
-        "currency": "USD",
-        "created_at": "2026-01-02T00:00:00Z"
-    }
 
+@pytest.fixture(scope="session")
+def client():
+    """세션 공유 TestClient (앱 lifespan 1회 실행)"""
+    from fastapi.testclient import TestClient
+    from main import app
 
-@pytest.fixture
-def sample_toss_payload():
-    """토스 Webhook 샘플 페이로드"""
-    return {
-        "paymentKey": "toss_pay_123",
-        "orderId": "order_456",
-        "status": "DONE",
-        "totalAmount": 50000,
-        "method": "카드",
-        "approvedAt": "2026-01-02T00:00:00+09:00"
-    }
+    with TestClient(app) as c:
+        yield c
 
 
-@pytest.fixture
-def sample_nodes():
-    """샘플 노드 데이터"""
-    return [
-        {"id": "node_1", "value": 100000},
-        {"id": "node_2", "value": 50000},
-        {"id": "node_3", "value": -10000},
-        {"id": "node_4", "value": 0},
-        {"id": "node_5", "value": 200000}
-    ]
+@pytest.fixture(autouse=True)
+def isolated_rate_limiter(request):
+    """
+    API 테스트마다 새 RateLimiter 주입
 
+    글로벌 rate_limiter 상태를 테스트 간 공유하지 않음 → 순서/병렬 실행과 무관
+    """
+    if not {"client", "async_client"} & set(request.fixturenames):
+        yield None
+        return
 
-@pytest.fixture
-def sample_motions():
-    """샘플 모션 데이터"""
-    return [
-        {"source": "node_1", "target": "node_2", "amount": 10000},
-        {"source": "node_1", "target": "node_2", "amount": 15000},
-        {"source": "node_2", "target": "node_3", "amount": 5000},
-        {"source": "node_1", "target": "node_2", "amount": 20000},
-        {"source": "node_3", "target": "node_4", "amount": 3000}
-    ]
+    from main import app
+    from auth.middleware import RateLimiter, get_rate_limiter
 
+    limiter = RateLimiter(max_requests=1000, window_seconds=60)
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    yield limiter
+    app.dependency_overrides.pop(get_rate_limiter, None)
 
-@pytest.fixture
-def sample_erp_data():
-    """샘플 ERP 데이터 (하이클래스)"""
-    return {
-        "student_id": "STU_001",
-        "student_name": "홍길동",
-        "tuition": 300000,
-        "payment": 300000,
-        "created_at": "2026-01-02T00:00:00"
-    }
 
+@pytest.fixture(autouse=True)
+def isolated_cleanse_cache(request):
+    """
+    API 테스트마다 웹훅 중복 제거 캐시 비우기
+
+    글로벌 cleanse_cache (TTL 300초)를 테스트 간 공유하지 않음
+    → 같은 본문을 보낸 이전 테스트가 있어도 deduped로 바뀌지 않음 (순서/재실행과 무관)
+    """
+    if not {"client", "async_client"} & set(request.fixturenames):
+        yield None
+        return
+
+    from webhooks.dedup import cleanse_cache
+
+    cleanse_cache.clear()
+    yield cleanse_cache
+    cleanse_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def get_cached(client):
+    """
+    읽기 전용 GET 응답 캐시 (경로당 1회 요청)
+
+    테스트 중 상태가 바뀌지 않는 조회 엔드포인트 전용
+    """
+    cache = {}
+
+    def _get(path: str):
+        if path not in cache:
+            cache[path] = client.get(path)
+        return cache[path]
+
+    return _get
+
+
+@pytest_asyncio.fixture
+async def async_client():
+    """ASGI 직결 httpx.AsyncClient (asyncio.gather로 독립 요청 동시 실행용)"""
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
 
-@pytest.fixture
-def sample_crm_data():
-    """샘플 CRM 데이터 (HubSpot)"""
-    return {
-        "id": "contact_123",
-        "properties": {
-            "hs_contact_id": "456",
-            "hs_deal_amount": "1000000",
-            "firstname": "John",
-            "lastname": "Doe",
-            "email": "john@example.com",
-            "createdate": "2026-01-02T00:00:00Z"
-        }
-    }
 
+@pytest.fixture(scope="session")
+def admin_token(client):
+    """admin 로그인 JWT (세션당 1회 로그인)"""
+    response = client.post("/auth/login", json={
+        "username": "admin",
+        "password": "admin123"
+    })
+    return response.json()["access_token"]
 
 
+@pytest.fixture(scope="session")
+def user_token(client):
+    """user 로그인 JWT (세션당 1회 로그인)"""
+    response = client.post("/auth/login", json={
+        "username": "user",
+        "password": "user123"
+    })
+    return response.json()["access_token"]
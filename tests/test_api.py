@@ -2,125 +2,153 @@
 # FastAPI 엔드포인트 테스트
 
 import pytest
-from fastapi.testclient import TestClient
-import sys
-import os
+import asyncio
+import json
+import logging
+from pydantic import ValidationError
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from autosync.api import TransformRequest
+from main import start_log_listener, stop_log_listener
 
-from main import app
 
-client = TestClient(app)
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _json_body(payload: dict) -> bytes:
+    """요청 본문 사전 직렬화 (모듈 로드 시 1회)"""
+    return json.dumps(payload).encode()
+
+
+# 요청 페이로드 상수 (직렬화된 bytes → 요청마다 json.dumps 없음, 변경 불가)
+ANALYZE_PAYLOAD = _json_body({
+    "nodes": (
+        {"id": "node_1", "value": 100000},
+        {"id": "node_2", "value": -10000}
+    ),
+    "motions": (
+        {"source": "node_1", "target": "node_2", "amount": 5000},
+    )
+})
+QUICK_DELETE_PAYLOAD = _json_body({
+    "nodes": (
+        {"id": "a", "value": 100},
+        {"id": "b", "value": -50},
+        {"id": "c", "value": 0}
+    ),
+    "motions": ()
+})
+QUICK_AUTOMATE_PAYLOAD = _json_body({
+    "nodes": (),
+    "motions": (
+        {"source": "a", "target": "b", "amount": 100},
+        {"source": "a", "target": "b", "amount": 200},
+        {"source": "a", "target": "b", "amount": 300}
+    )
+})
+PARASITIC_CONNECT_PAYLOAD = _json_body({"saas_type": "toss_pos"})
+PHYSICS_EVENT_PAYLOAD = _json_body({
+    "event_type": "mint",
+    "amount": 1000000,
+    "minutes": 60,
+    "participants": ("P01",)
+})
 
 
 class TestHealthEndpoint:
     """Health Check 테스트"""
     
-    def test_health_check(self):
+    def test_health_check(self, get_cached):
         """헬스 체크"""
-        response = client.get("/health")
+        response = get_cached("/health")
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
     
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, get_cached):
         """루트 엔드포인트"""
-        response = client.get("/")
+        response = get_cached("/")
         assert response.status_code == 200
         data = response.json()
         assert "name" in data
         assert "AUTUS" in data["name"]
     
-    def test_strategy_endpoint(self):
+    def test_strategy_endpoint(self, get_cached):
         """전략 엔드포인트"""
-        response = client.get("/strategy")
+        response = get_cached("/strategy")
         assert response.status_code == 200
         data = response.json()
-        assert "core_strategies" in data
-        assert "projected_roi" in data
+        assert {"core_strategies", "projected_roi"} <= data.keys()
+
+
+class TestLogListener:
+    """로그 리스너 (lifespan 로깅 설정) 테스트"""
+    
+    def test_log_listener_restores_root(self):
+        """로그 리스너 정지 후 루트 로거 레벨/핸들러 원복"""
+        root = logging.getLogger()
+        previous_level = root.level
+        root.setLevel(logging.WARNING)
+        try:
+            handler, listener, level = start_log_listener()
+            assert root.level == logging.INFO
+            assert listener.handlers[0].formatter is not None
+            
+            stop_log_listener(handler, listener, level)
+            assert root.level == logging.WARNING
+            assert handler not in root.handlers
+        finally:
+            root.setLevel(previous_level)
 
 
 class TestAutoSyncAPI:
     """AutoSync API 테스트"""
     
-    def test_list_systems(self):
+    def test_list_systems(self, get_cached):
         """시스템 목록"""
-        response = client.get("/autosync/systems")
+        response = get_cached("/autosync/systems")
         assert response.status_code == 200
         data = response.json()
         assert "total" in data
         assert data["total"] >= 15
     
-    def test_detect_from_cookies(self):
-        """쿠키로 감지"""
-        response = client.post("/autosync/detect", json={
-            "cookies": "__stripe_mid=abc123"
-        })
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert "stripe" in data["detected"]
-    
-    def test_detect_from_domains(self):
-        """도메인으로 감지"""
-        response = client.post("/autosync/detect", json={
-            "domains": ["hubspot.com", "api.hubapi.com"]
-        })
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert "hubspot" in data["detected"]
-    
-    def test_detect_from_api_key(self):
-        """API 키로 감지"""
-        response = client.post("/autosync/detect", json={
-            "api_key": "sk_live_abc123"
-        })
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert "stripe" in data["detected"]
-    
-    def test_detect_combined(self):
-        """통합 감지"""
-        response = client.post("/autosync/detect", json={
+    @pytest.mark.parametrize("payload, expected_systems, min_count", [
+        pytest.param({"cookies": "__stripe_mid=abc123"}, ["stripe"], 1, id="cookies"),
+        pytest.param({"domains": ["hubspot.com", "api.hubapi.com"]}, ["hubspot"], 1, id="domains"),
+        pytest.param({"api_key": "sk_live_abc123"}, ["stripe"], 1, id="api_key"),
+        pytest.param({
             "cookies": "__stripe_mid=abc",
             "domains": ["hubspot.com"],
             "api_key": "live_sk_xyz"
-        })
-        assert response.status_code == 200
-        data = response.json()
-        assert data["count"] >= 2
-    
-    def test_transform_stripe(self):
-        """Stripe 데이터 변환"""
-        response = client.post("/autosync/transform", json={
-            "data": {
-                "customer": "cus_123",
-                "amount": 5000
-            },
-            "system_id": "stripe"
-        })
+        }, [], 2, id="combined"),
+        pytest.param({}, [], 0, id="empty"),
+    ])
+    def test_detect(self, client, payload, expected_systems, min_count):
+        """쿠키/도메인/API 키 감지"""
+        response = client.post("/autosync/detect", json=payload)
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
-        assert data["transformed"]["node_id"] == "cus_123"
-        assert data["transformed"]["value"] == 50.0
+        assert all(system in data["detected"] for system in expected_systems)
+        assert data["count"] >= min_count
+        if not payload:
+            assert data["count"] == 0
     
-    def test_transform_toss(self):
-        """토스 데이터 변환"""
+    @pytest.mark.parametrize("system_id, data, expected_node_id, expected_value", [
+        pytest.param("stripe", {"customer": "cus_123", "amount": 5000}, "cus_123", 50.0, id="stripe"),
+        pytest.param("toss", {"orderId": "order_123", "totalAmount": 50000}, "order_123", 50000.0, id="toss"),
+    ])
+    def test_transform(self, client, system_id, data, expected_node_id, expected_value):
+        """SaaS 데이터 변환"""
         response = client.post("/autosync/transform", json={
-            "data": {
-                "orderId": "order_123",
-                "totalAmount": 50000
-            },
-            "system_id": "toss"
+            "data": data,
+            "system_id": system_id
         })
         assert response.status_code == 200
-        data = response.json()
-        assert data["transformed"]["node_id"] == "order_123"
-        assert data["transformed"]["value"] == 50000.0
+        result = response.json()
+        assert result["success"] is True
+        assert result["transformed"]["node_id"] == expected_node_id
+        assert result["transformed"]["value"] == expected_value
     
-    def test_connect_system(self):
+    def test_connect_system(self, client):
         """시스템 연결"""
         response = client.post("/autosync/connect?system_id=stripe")
         assert response.status_code == 200
@@ -132,56 +160,33 @@ class TestAutoSyncAPI:
 class TestCrewAIAPI:
     """CrewAI API 테스트"""
     
-    def test_analyze(self):
+    def test_analyze(self, client):
         """분석 실행"""
-        response = client.post("/crewai/analyze", json={
-            "nodes": [
-                {"id": "node_1", "value": 100000},
-                {"id": "node_2", "value": -10000}
-            ],
-            "motions": [
-                {"source": "node_1", "target": "node_2", "amount": 5000}
-            ]
-        })
+        response = client.post("/crewai/analyze", content=ANALYZE_PAYLOAD, headers=JSON_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
-        assert "delete" in data
-        assert "automate" in data
+        assert {"delete", "automate"} <= data.keys()
     
-    def test_quick_delete(self):
+    def test_quick_delete(self, client):
         """빠른 삭제 분석"""
-        response = client.post("/crewai/quick-delete", json={
-            "nodes": [
-                {"id": "a", "value": 100},
-                {"id": "b", "value": -50},
-                {"id": "c", "value": 0}
-            ],
-            "motions": []
-        })
+        response = client.post("/crewai/quick-delete", content=QUICK_DELETE_PAYLOAD, headers=JSON_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
         assert data["count"] == 2  # b와 c
     
-    def test_quick_automate(self):
+    def test_quick_automate(self, client):
         """빠른 자동화 분석"""
-        response = client.post("/crewai/quick-automate", json={
-            "nodes": [],
-            "motions": [
-                {"source": "a", "target": "b", "amount": 100},
-                {"source": "a", "target": "b", "amount": 200},
-                {"source": "a", "target": "b", "amount": 300}
-            ]
-        })
+        response = client.post("/crewai/quick-automate", content=QUICK_AUTOMATE_PAYLOAD, headers=JSON_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
         assert data["count"] == 1  # a->b 3회 반복
     
-    def test_health(self):
+    def test_health(self, get_cached):
         """CrewAI 헬스 체크"""
-        response = client.get("/crewai/health")
+        response = get_cached("/crewai/health")
         assert response.status_code == 200
         assert response.json()["status"] == "healthy"
 
@@ -189,82 +194,67 @@ class TestCrewAIAPI:
 class TestParasiticAPI:
     """Parasitic API 테스트"""
     
-    def test_list_supported(self):
+    def test_list_supported(self, get_cached):
         """지원 시스템 목록"""
-        response = client.get("/parasitic/supported")
+        response = get_cached("/parasitic/supported")
         assert response.status_code == 200
         data = response.json()
         assert "supported" in data
         assert len(data["supported"]) >= 5
     
-    def test_connect(self):
+    def test_connect(self, client):
         """연동 시작"""
-        response = client.post("/parasitic/connect", json={
-            "saas_type": "toss_pos"
-        })
+        response = client.post("/parasitic/connect", content=PARASITIC_CONNECT_PAYLOAD, headers=JSON_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert "connector_id" in data
         assert data["success"] is True
     
-    def test_status(self):
+    def test_status(self, client):
         """상태 조회"""
         # 먼저 연결
-        client.post("/parasitic/connect", json={"saas_type": "toss_pos"})
+        client.post("/parasitic/connect", content=PARASITIC_CONNECT_PAYLOAD, headers=JSON_HEADERS)
         
         response = client.get("/parasitic/status")
         assert response.status_code == 200
         data = response.json()
-        assert "connectors" in data
-        assert "total" in data
+        assert {"connectors", "total"} <= data.keys()
     
-    def test_flywheel(self):
+    def test_flywheel(self, client):
         """플라이휠 상태"""
         response = client.get("/parasitic/flywheel")
         assert response.status_code == 200
         data = response.json()
-        assert "total" in data
-        assert "replaced" in data
-        assert "monthly_savings" in data
+        assert {"total", "replaced", "monthly_savings"} <= data.keys()
 
 
 class TestPhysicsAPI:
     """Physics Engine API 테스트"""
     
-    def test_physics_state(self):
-        """물리 엔진 상태"""
-        response = client.get("/physics/state")
-        assert response.status_code == 200
-        data = response.json()
-        assert "nodes" in data
-        assert "total_value" in data
-        assert "synergy" in data
-    
-    def test_physics_kpi(self):
-        """KPI 조회"""
-        response = client.get("/physics/kpi")
-        assert response.status_code == 200
-        data = response.json()
-        assert "total_mint" in data
-        assert "total_burn" in data
-        assert "synergy" in data
-    
-    def test_physics_predict(self):
-        """예측"""
-        response = client.get("/physics/predict")
-        assert response.status_code == 200
-        data = response.json()
-        assert "predicted_mint" in data
-        assert "confidence" in data
+    @pytest.mark.asyncio
+    async def test_physics_smoke(self, async_client):
+        """상태/KPI/예측 조회 (독립 GET 동시 실행)"""
+        state, kpi, predict = await asyncio.gather(
+            async_client.get("/physics/state"),
+            async_client.get("/physics/kpi"),
+            async_client.get("/physics/predict")
+        )
+        
+        assert state.status_code == 200
+        data = state.json()
+        assert {"nodes", "total_value", "synergy"} <= data.keys()
+        
+        assert kpi.status_code == 200
+        data = kpi.json()
+        assert {"total_mint", "total_burn", "synergy"} <= data.keys()
+        
+        assert predict.status_code == 200
+        data = predict.json()
+        assert {"predicted_mint", "confidence"} <= data.keys()
     
-    def test_physics_event(self):
+    def test_physics_event(self, client):
         """이벤트 추가"""
-        response = client.post("/physics/event", json={
-            "event_type": "mint",
-            "amount": 1000000,
-            "minutes": 60,
-            "participants": ["P01"]
-        })
+        response = client.post("/physics/event", content=PHYSICS_EVENT_PAYLOAD, headers=JSON_HEADERS)
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "ok"
@@ -274,7 +264,7 @@ class TestPhysicsAPI:
 class TestWebhookAPI:
     """Webhook API 테스트"""
     
-    def test_universal_webhook(self):
+    def test_universal_webhook(self, client):
         """범용 Webhook"""
         response = client.post("/webhook/universal", json={
             "type": "test",
@@ -288,7 +278,7 @@ class TestWebhookAPI:
         assert data["success"] is True
         assert "transformed" in data
     
-    def test_stripe_webhook_no_signature(self):
+    def test_stripe_webhook_no_signature(self, client):
         """Stripe Webhook (시그니처 없음 - 테스트 모드)"""
         response = client.post(
             "/webhook/stripe",
@@ -309,21 +299,26 @@ class TestWebhookAPI:
 class TestAPIValidation:
     """API 입력 검증 테스트"""
     
-    def test_detect_empty_request(self):
-        """빈 요청 처리"""
-        response = client.post("/autosync/detect", json={})
-        assert response.status_code == 200
-        data = response.json()
-        assert data["count"] == 0
-    
-    def test_transform_missing_data(self):
+    def test_transform_missing_data(self, client):
         """데이터 누락"""
         response = client.post("/autosync/transform", json={
             "system_id": "stripe"
         })
         assert response.status_code == 422  # Validation Error
     
-    def test_analyze_empty_nodes(self):
+    @pytest.mark.parametrize("payload", [
+        pytest.param({"system_id": "stripe"}, id="missing_data"),
+        pytest.param({}, id="empty"),
+        pytest.param({"data": ["not", "a", "dict"]}, id="data_list"),
+        pytest.param({"data": "raw"}, id="data_str"),
+        pytest.param({"data": {}, "system_id": 123}, id="system_id_int"),
+    ])
+    def test_transform_request_invalid(self, payload):
+        """변환 요청 스키마 검증 (ASGI 왕복 없이 모델 직접 생성)"""
+        with pytest.raises(ValidationError):
+            TransformRequest(**payload)
+    
+    def test_analyze_empty_nodes(self, client):
         """빈 노드 리스트"""
         response = client.post("/crewai/analyze", json={
             "nodes": [],
@@ -337,16 +332,20 @@ class TestAPIValidation:
 class TestWebSocketAPI:
     """WebSocket HTTP API 테스트"""
     
-    def test_websocket_stats(self):
+    def test_websocket_stats(self, client):
         """WebSocket 통계"""
         response = client.get("/websocket/stats")
         assert response.status_code == 200
         data = response.json()
         assert "total_connections" in data or "active_connections" in data
     
-    def test_websocket_broadcast_test(self):
-        """테스트 브로드캐스트"""
-        response = client.post("/websocket/broadcast/test?node_id=test_node&value=100000")
+    @pytest.mark.asyncio
+    async def test_websocket_broadcast_test(self, async_client):
+        """테스트 브로드캐스트 (이벤트 루프에서 직접 실행, 스레드 경유 없음)"""
+        response = await async_client.post(
+            "/websocket/broadcast/test",
+            params={"node_id": "test_node", "value": 100000}
+        )
         assert response.status_code == 200
         data = response.json()
         assert data["success"] is True
@@ -2,22 +2,36 @@
 # AutoSync 모듈 테스트
 
 import pytest
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from autosync.detector import AutoSyncDetector
 from autosync.transformer import UniversalTransformer, FlowTypeDetector
 from autosync.registry import SaaSRegistry, SystemType
 
 
+@pytest.fixture(scope="module")
+def detector():
+    """모듈 공유 감지기 (상태 없음 → 1회 생성)"""
+    return AutoSyncDetector()
+
+
+@pytest.fixture(scope="module")
+def transformer():
+    """모듈 공유 변환기 (상태 없음 → 1회 생성)"""
+    return UniversalTransformer()
+
+
+@pytest.fixture(scope="session")
+def saas_systems():
+    """등록된 SaaS 시스템 목록 (세션당 1회 조회)"""
+    return SaaSRegistry.get_all()
+
+
 class TestSaaSRegistry:
     """SaaS Registry 테스트"""
     
-    def test_registry_has_systems(self):
+    def test_registry_has_systems(self, saas_systems):
         """시스템 목록이 있는지"""
-        systems = SaaSRegistry.get_all()
+        systems = saas_systems
         assert len(systems) > 0
         assert len(systems) >= 15  # 최소 15개 이상
     
@@ -53,58 +67,76 @@ class TestSaaSRegistry:
 class TestAutoSyncDetector:
     """AutoSync 감지기 테스트"""
     
-    def setup_method(self):
-        self.detector = AutoSyncDetector()
-    
-    def test_detect_from_cookies_stripe(self):
+    def test_detect_from_cookies_stripe(self, detector):
         """Stripe 쿠키 감지"""
         cookies = "__stripe_mid=abc123; __stripe_sid=def456"
-        detected = self.detector.detect_from_cookies(cookies)
+        detected = detector.detect_from_cookies(cookies)
         assert "stripe" in detected
     
-    def test_detect_from_cookies_hubspot(self):
+    def test_detect_from_cookies_hubspot(self, detector):
         """HubSpot 쿠키 감지"""
         cookies = "hubspotutk=abc123; __hstc=def456"
-        detected = self.detector.detect_from_cookies(cookies)
+        detected = detector.detect_from_cookies(cookies)
         assert "hubspot" in detected
     
-    def test_detect_from_cookies_multiple(self):
+    def test_detect_from_cookies_multiple(self, detector):
         """여러 시스템 동시 감지"""
         cookies = "__stripe_mid=abc; hubspotutk=def"
-        detected = self.detector.detect_from_cookies(cookies)
+        detected = detector.detect_from_cookies(cookies)
         assert "stripe" in detected
         assert "hubspot" in detected
     
-    def test_detect_from_domains_stripe(self):
+    def test_detect_from_cookies_case_and_overlap(self, detector):
+        """대소문자 무시 + 붙어 있는 마커도 각각 감지"""
+        cookies = "highclass_session=1;toss_class101_id=2"
+        detected = detector.detect_from_cookies(cookies)
+        assert sorted(detected) == ["class101", "highclass", "toss"]
+    
+    def test_detect_from_cookies_shared_and_prefix_markers(self, monkeypatch):
+        """같은 마커를 공유하는 시스템 + 같은 위치에서 시작하는 짧은 마커도 모두 감지"""
+        monkeypatch.setattr(SaaSRegistry, "SYSTEMS", {
+            "a": {"detection": {"cookies": ["_shop"]}},
+            "b": {"detection": {"cookies": ["_shop"]}},
+            "c": {"detection": {"cookies": ["_shop_session"]}},
+        })
+        detected = AutoSyncDetector().detect_from_cookies("_shop_session=1")
+        assert sorted(detected) == ["a", "b", "c"]
+    
+    def test_detect_from_domains_stripe(self, detector):
         """Stripe 도메인 감지"""
         domains = ["stripe.com", "js.stripe.com", "google.com"]
-        detected = self.detector.detect_from_domains(domains)
+        detected = detector.detect_from_domains(domains)
         assert "stripe" in detected
     
-    def test_detect_from_domains_class101(self):
+    def test_detect_from_domains_class101(self, detector):
         """클래스101 도메인 감지"""
         domains = ["class101.net", "api.class101.net"]
-        detected = self.detector.detect_from_domains(domains)
+        detected = detector.detect_from_domains(domains)
         assert "class101" in detected
     
-    def test_detect_from_api_key_stripe(self):
+    def test_detect_from_domains_subdomain_only(self, detector):
+        """서브도메인은 감지, 비슷한 이름의 다른 도메인은 무시"""
+        detected = detector.detect_from_domains(["checkout.stripe.com", "notstripe.com"])
+        assert detected == ["stripe"]
+    
+    def test_detect_from_api_key_stripe(self, detector):
         """Stripe API 키 감지"""
-        detected = self.detector.detect_from_api_key("sk_live_abc123")
+        detected = detector.detect_from_api_key("sk_live_abc123")
         assert detected == "stripe"
     
-    def test_detect_from_api_key_toss(self):
+    def test_detect_from_api_key_toss(self, detector):
         """토스 API 키 감지"""
-        detected = self.detector.detect_from_api_key("live_sk_abc123")
+        detected = detector.detect_from_api_key("live_sk_abc123")
         assert detected == "toss"
     
-    def test_detect_from_api_key_unknown(self):
+    def test_detect_from_api_key_unknown(self, detector):
         """알 수 없는 API 키"""
-        detected = self.detector.detect_from_api_key("unknown_key_123")
+        detected = detector.detect_from_api_key("unknown_key_123")
         assert detected is None
     
-    def test_detect_all_combined(self):
+    def test_detect_all_combined(self, detector):
         """통합 감지"""
-        result = self.detector.detect_all(
+        result = detector.detect_all(
             cookies="__stripe_mid=abc",
             domains=["hubspot.com"],
             api_key="live_sk_xyz"
@@ -113,9 +145,9 @@ class TestAutoSyncDetector:
         assert "stripe" in result["detected"]
         assert "hubspot" in result["detected"]
     
-    def test_detect_all_empty(self):
+    def test_detect_all_empty(self, detector):
         """빈 입력"""
-        result = self.detector.detect_all()
+        result = detector.detect_all()
         assert result["count"] == 0
         assert result["detected"] == []
 
@@ -123,70 +155,67 @@ class TestAutoSyncDetector:
 class TestUniversalTransformer:
     """Universal Transformer 테스트"""
     
-    def setup_method(self):
-        self.transformer = UniversalTransformer()
-    
-    def test_transform_stripe(self):
+    def test_transform_stripe(self, transformer):
         """Stripe 데이터 변환"""
         data = {
             "customer": "cus_123",
             "amount": 5000,
             "created": "2026-01-02T00:00:00Z"
         }
-        result = self.transformer.transform(data, "stripe")
+        result = transformer.transform(data, "stripe")
         
         assert result["node_id"] == "cus_123"
         assert result["value"] == 50.0  # cents → dollars (/ 100)
         assert result["source"] == "stripe"
     
-    def test_transform_toss(self):
+    def test_transform_toss(self, transformer):
         """토스 데이터 변환"""
         data = {
             "orderId": "order_456",
             "totalAmount": 50000,
             "approvedAt": "2026-01-02T00:00:00+09:00"
         }
-        result = self.transformer.transform(data, "toss")
+        result = transformer.transform(data, "toss")
         
         assert result["node_id"] == "order_456"
         assert result["value"] == 50000.0
         assert result["source"] == "toss"
     
-    def test_transform_hubspot(self, sample_crm_data):
+    def test_transform_hubspot(self, transformer, sample_crm_data):
         """HubSpot 데이터 변환"""
-        result = self.transformer.transform(sample_crm_data, "hubspot")
+        result = transformer.transform(sample_crm_data, "hubspot")
         
         assert result["node_id"] == "456"  # properties.hs_contact_id
         assert result["source"] == "hubspot"
     
-    def test_transform_highclass(self, sample_erp_data):
+    def test_transform_highclass(self, transformer, sample_erp_data):
         """하이클래스 데이터 변환"""
-        result = self.transformer.transform(sample_erp_data, "highclass")
+        result = transformer.transform(sample_erp_data, "highclass")
         
         assert result["node_id"] == "STU_001"
         assert result["value"] == 300000.0
         assert result["source"] == "highclass"
     
-    def test_transform_unknown_system(self):
+    def test_transform_unknown_system(self, transformer):
         """알 수 없는 시스템 - 범용 변환"""
         data = {
             "id": "generic_123",
             "amount": 10000,
             "timestamp": "2026-01-02"
         }
-        result = self.transformer.transform(data, "unknown_system")
+        result = transformer.transform(data, "unknown_system")
         
         assert result["node_id"] == "generic_123"
         assert result["value"] == 10000.0
         assert result["source"] == "unknown"
     
-    def test_transform_generic_fallback(self):
+    def test_transform_generic_fallback(self, transformer):
         """매핑 없을 때 범용 추출"""
         data = {
             "customer_id": "fallback_123",
             "total": 25000
         }
-        result = self.transformer.transform(data, None)
+        result = transformer.transform(data, None)
         
         assert result["node_id"] == "fallback_123"
         assert result["value"] == 25000.0
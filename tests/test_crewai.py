@@ -2,10 +2,6 @@
 # CrewAI 모듈 테스트
 
 import pytest
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from crewai.agents import rule_based_analysis, create_summary
 
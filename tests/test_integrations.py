@@ -2,10 +2,6 @@
 # Integration 모듈 테스트 (Zero Meaning, Neo4j)
 
 import pytest
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from integrations.zero_meaning import ZeroMeaningFilter, FORBIDDEN_FIELDS
 
@@ -2,148 +2,102 @@
 # Webhook 처리 테스트
 
 import pytest
-import hashlib
-import hmac
 import base64
-import sys
-import os
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from integrations.zero_meaning import cleaner
+from webhooks.dedup import CleanseCache
+from webhooks.shopify_webhook import verify_shopify_hmac
+from webhooks.stripe_webhook import verify_stripe_signature
+from webhooks.tasks import run_logged
 
 
 class TestStripeWebhook:
     """Stripe Webhook 테스트"""
     
-    def test_verify_signature_valid(self):
+    def test_verify_signature_valid(self, stripe_signed_payload):
         """유효한 시그니처 검증"""
-        from webhooks.stripe_webhook import verify_stripe_signature
-        
-        payload = b'{"test": "data"}'
-        secret = "whsec_test_secret"
-        timestamp = "1234567890"
-        
-        # 올바른 시그니처 생성
-        signed_payload = f"{timestamp}.{payload.decode()}"
-        expected_sig = hmac.new(
-            secret.encode(),
-            signed_payload.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        
-        sig_header = f"t={timestamp},v1={expected_sig}"
-        
-        result = verify_stripe_signature(payload, sig_header, secret)
-        assert result is True
+        assert verify_stripe_signature(*stripe_signed_payload) is True
     
-    def test_verify_signature_invalid(self):
+    def test_verify_signature_invalid(self, stripe_signed_payload):
         """잘못된 시그니처"""
-        from webhooks.stripe_webhook import verify_stripe_signature
-        
-        payload = b'{"test": "data"}'
-        secret = "whsec_test_secret"
+        payload, _, secret = stripe_signed_payload
         sig_header = "t=1234567890,v1=invalid_signature"
         
         result = verify_stripe_signature(payload, sig_header, secret)
         assert result is False
     
-    def test_verify_signature_missing_parts(self):
+    def test_verify_signature_missing_parts(self, stripe_signed_payload):
         """시그니처 파트 누락"""
-        from webhooks.stripe_webhook import verify_stripe_signature
-        
-        payload = b'{"test": "data"}'
-        secret = "whsec_test_secret"
+        payload, _, secret = stripe_signed_payload
         sig_header = "invalid_format"
         
         result = verify_stripe_signature(payload, sig_header, secret)
         assert result is False
+    
+    def test_verify_signature_missing_timestamp(self, stripe_signed_payload):
+        """타임스탬프 누락"""
+        payload, _, secret = stripe_signed_payload
+        sig_header = "v1=" + "00" * 32
+        
+        result = verify_stripe_signature(payload, sig_header, secret)
+        assert result is False
 
 
 class TestShopifyWebhook:
     """Shopify Webhook 테스트"""
     
-    def test_verify_hmac_valid(self):
+    def test_verify_hmac_valid(self, shopify_signed_payload):
         """유효한 HMAC 검증"""
-        from webhooks.shopify_webhook import verify_shopify_hmac
-        
-        payload = b'{"test": "data"}'
-        secret = "shpss_test_secret"
-        
-        # 올바른 HMAC 생성
-        computed = base64.b64encode(
-            hmac.new(secret.encode(), payload, hashlib.sha256).digest()
-        ).decode()
-        
-        result = verify_shopify_hmac(payload, computed, secret)
-        assert result is True
+        assert verify_shopify_hmac(*shopify_signed_payload) is True
     
-    def test_verify_hmac_invalid(self):
+    def test_verify_hmac_invalid(self, shopify_signed_payload):
         """잘못된 HMAC"""
-        from webhooks.shopify_webhook import verify_shopify_hmac
-        
-        payload = b'{"test": "data"}'
-        secret = "shpss_test_secret"
+        payload, _, secret = shopify_signed_payload
         wrong_hmac = "invalid_hmac_value"
         
         result = verify_shopify_hmac(payload, wrong_hmac, secret)
         assert result is False
+    
+    def test_verify_hmac_wrong_digest(self, shopify_signed_payload):
+        """형식은 맞지만 다른 HMAC"""
+        payload, _, secret = shopify_signed_payload
+        wrong_hmac = base64.b64encode(b"\x00" * 32).decode()
+        
+        result = verify_shopify_hmac(payload, wrong_hmac, secret)
+        assert result is False
 
 
 class TestZeroMeaningFilter:
     """Zero Meaning 필터 테스트"""
     
-    def test_filter_removes_name(self, sample_stripe_payload):
-        """이름 필드 제거"""
-        from integrations.zero_meaning import ZeroMeaningFilter
-        
-        data = {
-            "customer": "cus_123",
-            "amount": 5000,
-            "name": "John Doe",
-            "first_name": "John",
-            "last_name": "Doe"
-        }
-        
-        result = ZeroMeaningFilter.clean(data)
-        
-        assert "name" not in result
-        assert "first_name" not in result
-        assert "last_name" not in result
-        assert result["customer"] == "cus_123"
-        assert result["amount"] == 5000
-    
-    def test_filter_removes_email(self):
-        """이메일 제거"""
-        from integrations.zero_meaning import ZeroMeaningFilter
-        
-        data = {
-            "id": "123",
-            "email": "test@example.com",
-            "phone": "010-1234-5678"
-        }
-        
-        result = ZeroMeaningFilter.clean(data)
-        
-        assert "email" not in result
-        assert "phone" not in result
-        assert result["id"] == "123"
-    
-    def test_filter_removes_description(self):
-        """설명 필드 제거"""
+    @pytest.mark.parametrize("data, removed, preserved", [
+        pytest.param(
+            {"customer": "cus_123", "amount": 5000, "name": "John Doe", "first_name": "John", "last_name": "Doe"},
+            ["name", "first_name", "last_name"],
+            {"customer": "cus_123", "amount": 5000},
+            id="name",
+        ),
+        pytest.param(
+            {"id": "123", "email": "test@example.com", "phone": "010-1234-5678"},
+            ["email", "phone"],
+            {"id": "123"},
+            id="email",
+        ),
+        pytest.param(
+            {"value": 10000, "description": "This is a test", "note": "Some note", "comment": "A comment"},
+            ["description", "note", "comment"],
+            {"value": 10000},
+            id="description",
+        ),
+    ])
+    def test_filter_removes_fields(self, data, removed, preserved):
+        """이름/연락처/설명 필드 제거, 나머지 보존"""
         from integrations.zero_meaning import ZeroMeaningFilter
         
-        data = {
-            "value": 10000,
-            "description": "This is a test",
-            "note": "Some note",
-            "comment": "A comment"
-        }
-        
         result = ZeroMeaningFilter.clean(data)
         
-        assert "description" not in result
-        assert "note" not in result
-        assert "comment" not in result
-        assert result["value"] == 10000
+        assert not set(removed) & result.keys()
+        assert {k: result.get(k) for k in preserved} == preserved
     
     def test_filter_preserves_numeric(self):
         """숫자 필드 보존"""
@@ -201,47 +155,149 @@ class TestZeroMeaningFilter:
             assert result["customer"]["id"] == "cus_123"
 
 
+class TestZeroMeaningCleaner:
+    """ZeroMeaningCleaner 금지 필드 제거 테스트"""
+    
+    def test_remove_forbidden_top_level_only(self):
+        """최상위 금지 필드만 제거 (대소문자 무시), 중첩 값은 그대로"""
+        data = {
+            "id": "ord_1",
+            "Email": "a@example.com",
+            "customer": {"id": "cus_1", "name": "John"},
+        }
+        
+        assert cleaner.remove_forbidden(data) == {
+            "id": "ord_1",
+            "customer": {"id": "cus_1", "name": "John"},
+        }
+
+
 class TestWebhookDataExtraction:
     """Webhook 데이터 추출 테스트"""
     
-    def test_extract_stripe_node_id(self, sample_stripe_payload):
-        """Stripe에서 node_id 추출"""
-        data = sample_stripe_payload["data"]["object"]
+    @pytest.mark.parametrize("payload_fixture, extract, expected", [
+        pytest.param("sample_stripe_payload",
+                     lambda d: d["data"]["object"].get("customer") or d["data"]["object"].get("id"),
+                     "cus_test_789", id="stripe-node_id"),
+        pytest.param("sample_stripe_payload",
+                     lambda d: d["data"]["object"].get("amount", 0) / 100,  # cents to dollars
+                     50.0, id="stripe-value"),
+        pytest.param("sample_shopify_payload",
+                     lambda d: str(d.get("customer", {}).get("id") or d.get("id")),
+                     "987654321", id="shopify-node_id"),
+        pytest.param("sample_shopify_payload",
+                     lambda d: float(d.get("total_price", 0)),
+                     100.0, id="shopify-value"),
+        pytest.param("sample_toss_payload",
+                     lambda d: d.get("orderId"),
+                     "order_456", id="toss-node_id"),
+        pytest.param("sample_toss_payload",
+                     lambda d: d.get("totalAmount", 0),
+                     50000, id="toss-value"),
+    ])
+    def test_extract(self, request, payload_fixture, extract, expected):
+        """소스별 node_id / value 추출"""
+        assert extract(request.getfixturevalue(payload_fixture)) == expected
+
+
+class TestCleanseCache:
+    """웹훅 재전송 중복 제거 캐시 테스트"""
+    
+    def test_hit_same_payload(self):
+        """같은 페이로드는 캐시 히트"""
+        cache = CleanseCache(ttl=60, maxsize=10)
+        key = cache.key("stripe", b'{"id": "evt_1"}')
+        cache.put(key, {"node_id": "cus_1", "value": 50.0})
+        
+        assert cache.get(cache.key("stripe", b'{"id": "evt_1"}')) == {"node_id": "cus_1", "value": 50.0}
+    
+    def test_miss_other_source(self):
+        """소스가 다르면 별도 키"""
+        cache = CleanseCache(ttl=60, maxsize=10)
+        cache.put(cache.key("stripe", b"{}"), {"node_id": "a"})
         
-        node_id = data.get("customer") or data.get("id")
-        assert node_id == "cus_test_789"
+        assert cache.get(cache.key("shopify", b"{}")) is None
     
-    def test_extract_stripe_value(self, sample_stripe_payload):
-        """Stripe에서 value 추출"""
-        data = sample_stripe_payload["data"]["object"]
+    def test_expired_entry(self):
+        """TTL 만료 후 미스"""
+        cache = CleanseCache(ttl=-1, maxsize=10)
+        key = cache.key("stripe", b"{}")
+        cache.put(key, {"node_id": "a"})
         
-        value = data.get("amount", 0) / 100  # cents to dollars
-        assert value == 50.0
+        assert cache.get(key) is None
+    
+    def test_maxsize_evicts_oldest(self):
+        """최대 크기 초과 시 가장 오래된 항목 제거"""
+        cache = CleanseCache(ttl=60, maxsize=2)
+        keys = [cache.key("stripe", bytes([i])) for i in range(3)]
+        for k in keys:
+            cache.put(k, {"node_id": "a"})
+        
+        assert cache.get(keys[0]) is None
+        assert cache.get(keys[2]) is not None
+    
+    def test_miss_other_topic(self):
+        """토픽이 다르면 별도 키"""
+        cache = CleanseCache(ttl=60, maxsize=10)
+        cache.put(cache.key("shopify", b"{}", "orders/create"), {"node_id": "a"})
+        
+        assert cache.get(cache.key("shopify", b"{}", "orders/paid")) is None
+
+
+class TestWebhookDedup:
+    """웹훅 엔드포인트 재전송 중복 제거 테스트"""
     
-    def test_extract_shopify_node_id(self, sample_shopify_payload):
-        """Shopify에서 node_id 추출"""
-        data = sample_shopify_payload
+    def test_stripe_redelivery_deduped(self, client):
+        """같은 Stripe 이벤트 재전송은 처리 생략"""
+        body = b'{"type": "invoice.paid", "data": {"object": {"customer": "cus_redeliver", "amount": 500}}}'
+        
+        first = client.post("/webhook/stripe", content=body)
+        second = client.post("/webhook/stripe", content=body)
         
-        node_id = str(data.get("customer", {}).get("id") or data.get("id"))
-        assert node_id == "987654321"
+        assert first.json()["accepted"] is True
+        assert second.json() == {"deduped": True, "node_id": "cus_redeliver", "processed": False}
     
-    def test_extract_shopify_value(self, sample_shopify_payload):
-        """Shopify에서 value 추출"""
-        data = sample_shopify_payload
+    def test_shopify_same_body_two_topics(self, client):
+        """같은 본문이라도 토픽이 다르면 각각 처리"""
+        body = b'{"id": 9101, "total_price": "12.00", "customer": {"id": 9102}}'
         
-        value = float(data.get("total_price", 0))
-        assert value == 100.0
+        created = client.post("/webhook/shopify", content=body, headers={"x-shopify-topic": "orders/create"})
+        paid = client.post("/webhook/shopify", content=body, headers={"x-shopify-topic": "orders/paid"})
+        
+        assert created.json()["accepted"] is True
+        assert paid.json()["accepted"] is True
     
-    def test_extract_toss_node_id(self, sample_toss_payload):
-        """토스에서 node_id 추출"""
-        data = sample_toss_payload
+    def test_unhandled_event_not_cached(self, client):
+        """미처리 이벤트는 캐시하지 않음 → 같은 키의 재전송은 다시 처리"""
+        body = b'{"id": 9201, "total_price": "7.00", "customer": {"id": 9202}}'
+        headers = {"x-shopify-topic": "orders/updated"}
+        
+        first = client.post("/webhook/shopify", content=body, headers=headers)
+        second = client.post("/webhook/shopify", content=body, headers=headers)
         
-        node_id = data.get("orderId")
-        assert node_id == "order_456"
+        assert first.json() == {"topic": "orders/updated", "processed": False}
+        assert second.json() == {"topic": "orders/updated", "processed": False}
+
+
+class TestBackgroundTasks:
+    """웹훅 후처리 (백그라운드) 테스트"""
     
-    def test_extract_toss_value(self, sample_toss_payload):
-        """토스에서 value 추출"""
-        data = sample_toss_payload
+    @pytest.mark.asyncio
+    async def test_run_logged_swallows_error(self, caplog):
+        """핸들러 예외는 전파되지 않고 로그로 기록"""
+        async def failing_handler(cleaned):
+            raise RuntimeError("neo4j down")
         
-        value = data.get("totalAmount", 0)
-        assert value == 50000
+        await run_logged(failing_handler, {"node_id": "a"})
+        
+        assert "failing_handler" in caplog.text
+    
+    def test_stripe_accepts_before_processing(self, client):
+        """Stripe 웹훅은 즉시 accepted 응답"""
+        response = client.post("/webhook/stripe", json={
+            "type": "invoice.paid",
+            "data": {"object": {"customer": "cus_bg", "amount": 1000}}
+        })
+        
+        assert response.status_code == 200
+        assert response.json() == {"event": "invoice.paid", "node_id": "cus_bg", "accepted": True}
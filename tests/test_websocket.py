@@ -3,12 +3,18 @@
 
 import pytest
 import asyncio
+import json
 import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from fastapi import WebSocketDisconnect
 
+from websocket import api as ws_api
 from websocket.manager import (
+    BROADCAST_BATCH_SIZE,
+    CLIENT_QUEUE_SIZE,
+    OFFLINE_QUEUE_SIZE,
+    OFFLINE_QUEUE_TTL,
+    WS_CLOSE_REPLACED,
+    WS_CLOSE_TRY_AGAIN_LATER,
     ConnectionManager,
     Message,
     broadcast_node_update,
@@ -17,6 +23,12 @@ from websocket.manager import (
 )
 
 
+@pytest.fixture(scope="class")
+def manager():
+    """읽기 전용 테스트 공유 매니저 (상태를 바꾸는 테스트는 직접 생성)"""
+    return ConnectionManager()
+
+
 class TestMessage:
     """Message 클래스 테스트"""
     
@@ -32,74 +44,387 @@ class TestMessage:
         """자동 타임스탬프"""
         msg = Message(type="test", data={})
         
-        assert msg.timestamp is not None
-        assert "2026" in msg.timestamp  # 현재 년도
+        assert isinstance(msg.timestamp, int)  # epoch ms
+        assert "2026" in msg.iso_timestamp  # 현재 년도
+
+    def test_message_to_json(self):
+        """전송용 JSON 직렬화"""
+        msg = Message(type="test", data={"name": "노드"})
+        decoded = json.loads(msg.to_json())
+
+        assert decoded == msg.to_dict()
+        assert "노드" in msg.to_json()  # ensure_ascii=False
+
+    def test_message_to_json_cached(self):
+        """인코딩 결과 재사용"""
+        msg = Message(type="test", data={"v": 1})
+
+        assert msg.to_json() is msg.to_json()
+        assert msg == Message(type="test", data={"v": 1}, timestamp=msg.timestamp)
 
 
 class TestConnectionManager:
     """ConnectionManager 테스트"""
     
-    def setup_method(self):
-        self.manager = ConnectionManager()
-    
-    def test_initial_state(self):
+    def test_initial_state(self, manager):
         """초기 상태"""
-        assert len(self.manager.active_connections) == 0
-        assert "physics-map" in self.manager.channels
-        assert "dashboard" in self.manager.channels
-        assert "flywheel" in self.manager.channels
-        assert "all" in self.manager.channels
+        assert len(manager.active_connections) == 0
+        assert "physics-map" in manager.channels
+        assert "dashboard" in manager.channels
+        assert "flywheel" in manager.channels
+        assert "all" in manager.channels
     
-    def test_disconnect_nonexistent(self):
+    def test_disconnect_nonexistent(self, manager):
         """존재하지 않는 클라이언트 해제"""
         # 에러 없이 처리되어야 함
-        self.manager.disconnect("nonexistent_client")
-        assert len(self.manager.active_connections) == 0
+        manager.disconnect("nonexistent_client")
+        assert len(manager.active_connections) == 0
     
-    def test_get_stats(self):
+    def test_get_stats(self, manager):
         """통계 조회"""
-        stats = self.manager.get_stats()
+        stats = manager.get_stats()
         
         assert "total_connections" in stats
         assert "total_messages" in stats
         assert "active_connections" in stats
         assert "channels" in stats
     
-    def test_get_clients_empty(self):
+    def test_get_clients_empty(self, manager):
         """빈 클라이언트 목록"""
-        clients = self.manager.get_clients()
+        clients = manager.get_clients()
         assert clients == []
 
+    def test_unsubscribe_swap_remove(self):
+        """구독 해제 후 리스트/인덱스 일관성"""
+        manager = ConnectionManager()  # 상태 변경 → 전용 인스턴스
+        for cid in ["a", "b", "c", "d"]:
+            manager._subscribe("dashboard", cid, asyncio.Queue())
+
+        manager._unsubscribe("dashboard", "b")
+        manager._unsubscribe("dashboard", "d")
+
+        subscribers = manager.channels["dashboard"]
+        index = manager._channel_index["dashboard"]
+        assert sorted(cid for cid, _ in subscribers) == ["a", "c"]
+        assert all(subscribers[i][0] == cid for cid, i in index.items())
+
+
+class FakeWebSocket:
+    """전송 내용을 기록하는 테스트용 WebSocket"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+    async def send_text(self, data: str):
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.sent.append(data)
+
+
+class StalledWebSocket(FakeWebSocket):
+    """전송이 끝나지 않는 (느린) WebSocket"""
+
+    async def send_text(self, data: str):
+        await asyncio.Event().wait()
+
+
+class ClientWebSocket(FakeWebSocket):
+    """엔드포인트 핸들러용 WebSocket (수신 메시지를 큐로 주입, 서버가 닫으면 수신 종료)"""
+
+    def __init__(self, client_id: str):
+        super().__init__()
+        self.query_params = {"client_id": client_id}
+        self.inbox = asyncio.Queue()
+
+    async def receive_json(self):
+        data = await self.inbox.get()
+        if data is None:
+            raise WebSocketDisconnect()
+        return data
+
+    async def close(self, code: int = 1000):
+        await super().close(code)
+        self.inbox.put_nowait(None)
+
+
+class TestConnectionManagerBroadcast:
+    """ConnectionManager 브로드캐스트 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_drops_failed_client(self):
+        """전송 실패 클라이언트만 해제, 나머지는 수신"""
+        manager = ConnectionManager()
+        ok, broken = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(ok, "ok", channels=["physics-map"])
+        await manager.connect(broken, "broken", channels=["physics-map"])
+        broken.fail = True
+
+        await manager.broadcast(Message(type="node_update", data={"v": 1}), channel="physics-map")
+        await asyncio.sleep(0.01)  # writer 태스크 실행
+
+        assert '"node_update"' in ok.sent[-1]
+        assert "broken" not in manager.active_connections
+        assert "ok" in manager.active_connections
+
+    @pytest.mark.asyncio
+    async def test_reconnect_same_id_routes_to_new_socket(self):
+        """같은 ID로 재연결하면 브로드캐스트는 새 소켓으로, 이전 소켓 실패는 무관"""
+        manager = ConnectionManager()
+        old, new = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(old, "x", channels=["physics-map"])
+        await asyncio.sleep(0.01)
+        await manager.connect(new, "x", channels=["physics-map"])
+        old.fail = True
+
+        await manager.broadcast(Message(type="node_update", data={"v": 1}), channel="physics-map")
+        await asyncio.sleep(0.01)
+
+        assert len(old.sent) == 1  # connected 메시지만
+        assert '"node_update"' in new.sent[-1]
+        assert manager.active_connections["x"] is new
+        assert [cid for cid, _ in manager.channels["physics-map"]] == ["x"]
+        assert "x" in manager.writers
+
+    @pytest.mark.asyncio
+    async def test_reconnect_closes_old_handler(self, monkeypatch):
+        """재연결 시 이전 소켓은 닫히고, 이전 핸들러가 종료해도 새 연결은 유지"""
+        manager = ConnectionManager()
+        monkeypatch.setattr(ws_api, "manager", manager)
+        old, new = ClientWebSocket("x"), ClientWebSocket("x")
+        old_handler = asyncio.create_task(ws_api.websocket_dashboard(old))
+        await asyncio.sleep(0.01)
+
+        new_handler = asyncio.create_task(ws_api.websocket_dashboard(new))
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(old_handler, timeout=1)
+
+        assert old.close_code == WS_CLOSE_REPLACED
+        assert manager.active_connections["x"] is new
+
+        new.inbox.put_nowait({"type": "ping"})
+        await asyncio.sleep(0.01)
+        assert '"pong"' in new.sent[-1]
+        assert not any('"pong"' in m for m in old.sent)
+
+        new.inbox.put_nowait(None)
+        await asyncio.wait_for(new_handler, timeout=1)
+        assert "x" not in manager.active_connections
+
+    @pytest.mark.asyncio
+    async def test_stale_writer_keeps_current_connection(self):
+        """이전 연결의 writer가 실패해도 같은 ID의 현재 연결은 유지"""
+        manager = ConnectionManager()
+        await manager.connect(FakeWebSocket(), "x", channels=["physics-map"])
+        current_writer = manager.writers["x"]
+
+        stale_queue = asyncio.Queue()
+        stale_queue.put_nowait("{}")
+        await manager._writer("x", FakeWebSocket(fail=True), stale_queue)
+
+        assert "x" in manager.active_connections
+        assert manager.writers["x"] is current_writer
+        assert not current_writer.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_broadcast_large_channel_batches(self):
+        """배치 크기를 넘는 채널도 모든 구독자에게 전달"""
+        manager = ConnectionManager()
+        sockets = [FakeWebSocket() for _ in range(BROADCAST_BATCH_SIZE * 2 + 1)]
+        for i, ws in enumerate(sockets):
+            await manager.connect(ws, f"c{i}", channels=["dashboard"])
+
+        await manager.broadcast(Message(type="webhook_received", data={}), channel="dashboard")
+        await asyncio.sleep(0.01)
+
+        assert all('"webhook_received"' in ws.sent[-1] for ws in sockets)
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_all_subscribers_once(self):
+        """"all" 구독자는 모든 채널 수신, 양쪽 구독해도 1회만"""
+        manager = ConnectionManager()
+        only_map, only_all, both = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(only_map, "map", channels=["physics-map"])
+        await manager.connect(only_all, "all", channels=["all"])
+        await manager.connect(both, "both", channels=["physics-map", "all"])
+
+        await manager.broadcast(Message(type="node_update", data={}), channel="physics-map")
+        await manager.broadcast(Message(type="flywheel_pulse", data={}), channel="flywheel")
+        await asyncio.sleep(0.01)
+
+        assert sum('"node_update"' in m for m in only_map.sent) == 1
+        assert sum('"node_update"' in m for m in both.sent) == 1
+        assert sum('"flywheel_pulse"' in m for m in only_all.sent) == 1
+        assert not any('"flywheel_pulse"' in m for m in only_map.sent)
+
+        manager.disconnect("all")
+        await manager.broadcast(Message(type="flywheel_pulse", data={}), channel="flywheel")
+        assert [cid for cid, _ in manager._targets("flywheel")] == ["both"]
+
+    @pytest.mark.asyncio
+    async def test_default_broadcast_reaches_every_connection(self):
+        """채널 생략 (= "all") 브로드캐스트는 구독 채널과 무관하게 모든 연결에 1회"""
+        manager = ConnectionManager()
+        sockets = [FakeWebSocket() for _ in range(3)]
+        for ws, channels in zip(sockets, (["physics-map"], ["dashboard"], ["flywheel", "all"])):
+            await manager.connect(ws, channels[0], channels=channels)
+
+        await manager.broadcast(Message(type="announce", data={}))
+        await asyncio.sleep(0.01)
+
+        assert all(sum('"announce"' in m for m in ws.sent) == 1 for ws in sockets)
+
+    @pytest.mark.asyncio
+    async def test_disconnect_unsubscribes_channels(self):
+        """해제 시 구독했던 채널에서 제거, 다른 구독자는 유지"""
+        manager = ConnectionManager()
+        await manager.connect(FakeWebSocket(), "a", channels=["physics-map", "custom"])
+        await manager.connect(FakeWebSocket(), "b", channels=["custom"])
+
+        manager.disconnect("a")
+
+        assert manager.channels["physics-map"] == []
+        assert [cid for cid, _ in manager.channels["custom"]] == ["b"]
+        assert "a" not in manager.metadata
+
+    @pytest.mark.asyncio
+    async def test_broadcast_many_single_frame(self):
+        """여러 메시지를 batch 프레임 하나로 전송"""
+        manager = ConnectionManager()
+        ws = FakeWebSocket()
+        await manager.connect(ws, "viewer", channels=["physics-map"])
+        await asyncio.sleep(0.01)
+        sent_before = len(ws.sent)
+
+        messages = [Message(type="node_update", data={"i": i}) for i in range(3)]
+        await manager.broadcast_many(messages, channel="physics-map")
+        await asyncio.sleep(0.01)
+
+        assert len(ws.sent) == sent_before + 1
+        frame = json.loads(ws.sent[-1])
+        assert frame["type"] == "batch"
+        assert frame["events"] == [m.to_dict() for m in messages]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_stats(self):
+        """브로드캐스트 통계: 구독자 수만큼 메시지, 채널당 1회"""
+        manager = ConnectionManager()
+        for i in range(3):
+            await manager.connect(FakeWebSocket(), f"c{i}", channels=["flywheel"])
+        before = manager.stats["total_messages"]
+
+        await manager.broadcast(Message(type="flywheel_pulse", data={}), channel="flywheel")
+
+        assert manager.stats["total_messages"] == before + 3
+        assert manager.stats["messages_per_channel"]["flywheel"] == 1
+
+    @pytest.mark.asyncio
+    async def test_broadcast_drops_slow_client(self):
+        """송신 큐가 가득 찬 느린 클라이언트는 해제, broadcast는 블로킹 없음"""
+        manager = ConnectionManager()
+        await manager.connect(StalledWebSocket(), "slow", channels=["physics-map"])
+
+        for i in range(CLIENT_QUEUE_SIZE + 1):
+            await manager.broadcast(Message(type="node_update", data={"v": i}), channel="physics-map")
+
+        assert "slow" not in manager.active_connections
+        assert "slow" not in manager.writers
+
+    @pytest.mark.asyncio
+    async def test_slow_client_socket_closed(self):
+        """느린 클라이언트는 소켓도 닫아 재연결 유도 (broadcast / send_personal 모두)"""
+        manager = ConnectionManager()
+        by_broadcast, by_personal = StalledWebSocket(), StalledWebSocket()
+        await manager.connect(by_broadcast, "slow", channels=["physics-map"])
+        await manager.connect(by_personal, "slow2", channels=["dashboard"])
+
+        for i in range(CLIENT_QUEUE_SIZE + 1):
+            await manager.broadcast(Message(type="node_update", data={"v": i}), channel="physics-map")
+            await manager.send_personal("slow2", Message(type="pong", data={}))
+        await asyncio.sleep(0.01)  # close 태스크 실행
+
+        assert by_broadcast.close_code == WS_CLOSE_TRY_AGAIN_LATER
+        assert by_personal.close_code == WS_CLOSE_TRY_AGAIN_LATER
+        assert "slow2" not in manager.active_connections
+
+
+class TestOfflineQueue:
+    """오프라인 메시지 큐 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_offline_queue_bounded_and_replayed(self):
+        """최신 OFFLINE_QUEUE_SIZE개만 보관, 재연결 시 순서대로 전송"""
+        manager = ConnectionManager()
+        for i in range(OFFLINE_QUEUE_SIZE + 5):
+            await manager.send_personal("ghost", Message(type="note", data={"i": i}))
+
+        assert len(manager.message_queue["ghost"]) == OFFLINE_QUEUE_SIZE
+
+        ws = FakeWebSocket()
+        await manager.connect(ws, "ghost", channels=["dashboard"])
+        await asyncio.sleep(0.01)
+
+        assert '"connected"' in ws.sent[0]
+        assert '"i":5' in ws.sent[1]
+        assert len(ws.sent) == OFFLINE_QUEUE_SIZE + 1
+        assert "ghost" not in manager.message_queue
+
+    @pytest.mark.asyncio
+    async def test_offline_queue_expires(self):
+        """TTL 지난 오프라인 큐는 정리"""
+        manager = ConnectionManager()
+        await manager.send_personal("ghost", Message(type="note", data={}))
+
+        manager._last_sweep -= OFFLINE_QUEUE_TTL + 1
+        manager._queue_touched["ghost"] -= OFFLINE_QUEUE_TTL + 1
+        await manager.send_personal("other", Message(type="note", data={}))
+
+        assert "ghost" not in manager.message_queue
+        assert "other" in manager.message_queue
+
 
 class TestBroadcastFunctions:
     """브로드캐스트 함수 테스트"""
     
     @pytest.mark.asyncio
-    async def test_broadcast_node_update(self):
-        """노드 업데이트 브로드캐스트"""
-        # 연결 없이도 에러 없이 실행되어야 함
+    async def test_broadcast_without_connections(self):
+        """노드/모션/시너지 브로드캐스트 - 연결 없이도 에러 없이 실행 (이벤트 루프 1회)"""
         await broadcast_node_update("node_123", 50000, "stripe")
-    
-    @pytest.mark.asyncio
-    async def test_broadcast_motion_update(self):
-        """모션 업데이트 브로드캐스트"""
         await broadcast_motion_update("node_001", "node_002", 10000)
-    
-    @pytest.mark.asyncio
-    async def test_broadcast_synergy_update(self):
-        """시너지 업데이트 브로드캐스트"""
         await broadcast_synergy_update(1.5, 1000000)
 
+    @pytest.mark.asyncio
+    async def test_broadcast_template_frame(self, monkeypatch):
+        """JSON 템플릿 출력이 유효한 JSON이고 호출마다 새 값이 채워짐"""
+        manager = ConnectionManager()
+        monkeypatch.setattr(sys.modules["websocket.manager"], "manager", manager)
+        ws = FakeWebSocket()
+        await manager.connect(ws, "viewer", channels=["physics-map"])
+
+        await broadcast_node_update('node_"a"', 100, "stripe")
+        await broadcast_node_update("node_b", 200)
+        await asyncio.sleep(0.01)
+
+        first, second = json.loads(ws.sent[-2]), json.loads(ws.sent[-1])
+        assert first["data"] == {"node_id": 'node_"a"', "value": 100, "source": "stripe", "action": "pulse"}
+        assert second["type"] == "node_update"
+        assert second["data"]["node_id"] == "node_b"
+        assert second["data"]["source"] == "webhook"
+        assert second["timestamp"]
+
 
 class TestWebSocketAPI:
     """WebSocket HTTP API 테스트"""
     
-    def test_stats_endpoint(self):
-        """통계 엔드포인트"""
-        from fastapi.testclient import TestClient
-        from main import app
-        
-        client = TestClient(app)
+    def test_stats_endpoint(self, client):
+        """통계 엔드포인트 (라우팅 포함 HTTP 경유)"""
         response = client.get("/websocket/stats")
         
         assert response.status_code == 200
@@ -107,64 +432,30 @@ class TestWebSocketAPI:
         assert "active_connections" in data
         assert "total_messages" in data
     
-    def test_clients_endpoint(self):
-        """클라이언트 목록 엔드포인트"""
-        from fastapi.testclient import TestClient
-        from main import app
-        
-        client = TestClient(app)
-        response = client.get("/websocket/clients")
+    # 이하 핸들러 직접 호출 (ASGI 스택 생략)
+    
+    @pytest.mark.asyncio
+    async def test_clients_handler(self):
+        """클라이언트 목록 핸들러"""
+        data = await ws_api.get_clients()
         
-        assert response.status_code == 200
-        data = response.json()
         assert "clients" in data
         assert "count" in data
     
-    def test_broadcast_test_endpoint(self):
-        """테스트 브로드캐스트 엔드포인트"""
-        from fastapi.testclient import TestClient
-        from main import app
-        
-        client = TestClient(app)
-        response = client.post(
-            "/websocket/broadcast/test",
-            params={"node_id": "test_node", "value": 100000}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
+    @pytest.mark.asyncio
+    async def test_broadcast_test_handler(self):
+        """테스트 브로드캐스트 핸들러"""
+        data = await ws_api.broadcast_test(node_id="test_node", value=100000)
         assert data["success"] is True
     
-    def test_broadcast_motion_endpoint(self):
-        """모션 브로드캐스트 엔드포인트"""
-        from fastapi.testclient import TestClient
-        from main import app
-        
-        client = TestClient(app)
-        response = client.post(
-            "/websocket/broadcast/motion",
-            params={
-                "source": "node_001",
-                "target": "node_002",
-                "amount": 50000
-            }
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
+    @pytest.mark.asyncio
+    async def test_broadcast_motion_handler(self):
+        """모션 브로드캐스트 핸들러"""
+        data = await ws_api.broadcast_motion_test(source="node_001", target="node_002", amount=50000)
         assert data["success"] is True
     
-    def test_broadcast_synergy_endpoint(self):
-        """시너지 브로드캐스트 엔드포인트"""
-        from fastapi.testclient import TestClient
-        from main import app
-        
-        client = TestClient(app)
-        response = client.post(
-            "/websocket/broadcast/synergy",
-            params={"synergy": 1.5, "total_value": 1000000}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
+    @pytest.mark.asyncio
+    async def test_broadcast_synergy_handler(self):
+        """시너지 브로드캐스트 핸들러"""
+        data = await ws_api.broadcast_synergy_test(synergy=1.5, total_value=1000000)
         assert data["success"] is True